@@ -1,92 +1,223 @@
+import sys
 import time
-import json
+import argparse
 import numpy as np
-import pandas as pd
 from PIL import Image
-from random import choice
+from queue import Empty
+from tkinter import TclError
+from random import choice, sample
 import customtkinter as ctk
 from threading import Thread
-import matplotlib.pyplot as plt
-from multiprocessing import Process
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from contextlib import contextmanager
+from wordle_engine import Pattern_Engine, Guess_Ranking, WORD_LENGTH, METRICS, ADVERSARY_RULES, RANKING_CACHE_SIZE, load_word_list, word_list_files
+from wordle_solver import Wordle_Solver, Multi_Board_Solver
+from wordle_worker import Hint_Worker
+from wordle_history import Game_History, HISTORY_FILE
+from wordle_trace import tracer
+
+# stages the loading bar waits for, in order
+STARTUP_STAGES = ('window', 'word lists', 'engine')
+
+# hint rows on screen, recycled while the ranking scrolls under them
+HINT_ROWS = 10
+
+# boards -> (grids per row, square size) for the multi-board window
+BOARD_LAYOUT = {2: (2, 40), 4: (2, 30), 8: (4, 22)}
+
+# stats chart views: button text -> what is drawn
+CHART_VIEWS = {'Wins': 'wins', 'Win %': 'win_rate', 'Avg': 'average_guesses'}
+
+
+class Startup_Profile:
+    def __init__(self, stages = STARTUP_STAGES, enabled = False):
+        self.stages = stages
+        self.enabled = enabled
+        self.start_time = time.perf_counter()
+        self.timings = {}
+        self.ready = False
+
+        # read by the loading bar on the Tk thread, written by whichever thread runs the stage
+        self.current = stages[0]
+        self.fraction = 0
+
+    @contextmanager
+    def stage(self, name):
+        # only the stages the loading bar waits for move it
+        first = name not in self.timings
+        if name in self.stages:
+            self.current = name
+            self.fraction = 0
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = time.perf_counter() - start_time
+            if name == self.current:
+                self.fraction = 1
+            # stages after startup (like the stats chart) are reported when they first run
+            if self.enabled and self.ready and first:
+                print(f'  {name:<16}{self.timings[name]:8.3f}s')
+
+    def update(self, fraction):
+        self.fraction = fraction
+
+    def progress(self):
+        return (self.stages.index(self.current) + self.fraction) / len(self.stages)
+
+    def report(self):
+        self.ready = True
+        if not self.enabled:
+            return
+        print('Startup profile:')
+        for name, seconds in self.timings.items():
+            print(f'  {name:<16}{seconds:8.3f}s')
+        print(f"  {'ready':<16}{time.perf_counter() - self.start_time:8.3f}s")
+
 
 class Wordle(ctk.CTk):
-    def __init__(self):
-        super().__init__()
-        self.title('Wordle')
-        self.resizable(False, False)
-        self.configure(fg_color = 'white')
-
-        # display parameters
-        self.window_width = 1000
-        self.window_height = 600
-        self.display_width = self.winfo_screenwidth()
-        self.display_height = self.winfo_screenheight()
-        self.left = int(self.display_width/2 - self.window_width/2)
-        self.top = int(self.display_height/2 - self.window_height/2)
-        self.geometry(f'{self.window_width}x{self.window_height}+{self.left}+{self.top}')
-        self.iconbitmap('Assets/logo.ico')
-
-        # Loading Screen
-        bg_image = ctk.CTkImage(dark_image = Image.open('Assets/bg.jpg'), size = (1000,600))
-        self.bg_label = ctk.CTkLabel(self, image = bg_image, text = '')
-        self.bg_label.place(x = 0,y = 0)
+    def __init__(self, engine = None, metric = 'expected_info', profile_startup = False, word_length = WORD_LENGTH, word_files = (None, None), trace_file = None, adversary = None, boards = None, memory_cap = None, hard_mode = False, cache_size = RANKING_CACHE_SIZE, history_file = HISTORY_FILE, run = True):
+        profile = Startup_Profile(enabled = profile_startup)
+        with profile.stage('window'):
+            super().__init__()
+            self.profile = profile
+            self.engine = engine
+            if engine is not None:
+                word_length = engine.word_length
+            elif word_length is None:
+                # custom word lists: the grid needs the length before the engine has loaded
+                word_length = len(load_word_list(word_files[0])[0])
+            self.word_length = word_length
+            self.word_files = word_files
+            self.memory_cap = memory_cap
+            self.cache_size = cache_size
+            self.history_file = history_file
+            self.trace_file = trace_file
+            self.adversary = adversary
+            self.hard_mode = hard_mode
+            self.open_boards = boards is not None
+            self.board_count = boards or 4
+            self.multi_board = None
+            tracer.enabled = tracer.enabled or trace_file is not None
+            self.metric = metric
+            self.lookahead = False
+            self.update_title()
+            self.resizable(False, False)
+            self.configure(fg_color = 'white')
+
+            # display parameters
+            self.window_width = 1000
+            self.window_height = 600
+            self.display_width = self.winfo_screenwidth()
+            self.display_height = self.winfo_screenheight()
+            self.left = int(self.display_width/2 - self.window_width/2)
+            self.top = int(self.display_height/2 - self.window_height/2)
+            self.geometry(f'{self.window_width}x{self.window_height}+{self.left}+{self.top}')
+            try:
+                self.iconbitmap('Assets/logo.ico')
+            except TclError:
+                # .ico icons are Windows-only, elsewhere the window keeps the default icon
+                pass
+
+            # Loading Screen
+            bg_image = ctk.CTkImage(dark_image = Image.open('Assets/bg.jpg'), size = (1000,600))
+            self.bg_label = ctk.CTkLabel(self, image = bg_image, text = '')
+            self.bg_label.place(x = 0,y = 0)
         
-        self.loading_var = ctk.DoubleVar(value = 0)
-        self.loading_progress = ctk.CTkProgressBar(self,
-            variable = self.loading_var, 
-            corner_radius = 0, 
-            width = 300, 
-            height = 30, 
-            progress_color = '#FFC900', 
-            fg_color = '#973F0D', 
-            border_width = 2, 
-            border_color = 'white')
-        self.loading_progress.place(x = 500, y = 540, anchor = 'center')
-
-        main_thread = Thread(target = self.setup)
-        main_thread.start()
-
-        # run
-        self.mainloop()
+            self.loading_var = ctk.DoubleVar(value = 0)
+            self.loading_progress = ctk.CTkProgressBar(self,
+                variable = self.loading_var, 
+                corner_radius = 0, 
+                width = 300, 
+                height = 30, 
+                progress_color = '#FFC900', 
+                fg_color = '#973F0D', 
+                border_width = 2, 
+                border_color = 'white')
+            self.loading_progress.place(x = 500, y = 540, anchor = 'center')
+            self.loading_label = ctk.CTkLabel(self, text = '', text_color = 'white', fg_color = '#973F0D', corner_radius = 0, width = 300, height = 20)
+            self.loading_label.place(x = 500, y = 510, anchor = 'center')
+
+        # the engine loads on a background thread; widgets are only touched from the Tk thread
+        self.engine_error = None
+        self.engine_thread = Thread(target = self.load_engine, daemon = True)
+        self.engine_thread.start()
+        self.after(0, self.setup)
+        self.protocol('WM_DELETE_WINDOW', self.close_app)
+
+        # run (run = False leaves the event loop to the caller, as wordle_ui_harness does)
+        if run:
+            self.mainloop()
+
+    def load_engine(self):
+        # runs off the Tk thread: progress is only recorded, wait_for_engine shows it
+        # an error is kept for wait_for_engine, the thread would otherwise end without a trace
+        if self.engine is None:
+            try:
+                with self.profile.stage('word lists'):
+                    engine = Pattern_Engine(*self.word_files, build = False, word_length = self.word_length, memory_cap = self.memory_cap)
+                with self.profile.stage('engine'):
+                    engine.load_matrix(progress = self.profile.update)
+            except Exception as error:
+                self.engine_error = error
+                return
+            self.engine = engine
 
     def setup(self):
-        # Word List & Target Word
-        self.short_word_list = self.create_word_list(short = True)
-        self.long_word_list = self.create_word_list(short = False)
+        with self.profile.stage('widgets'):
+            # Game History (migrates data.json on first run)
+            self.game_history = Game_History(self.history_file)
+            self.stats_data = self.game_history.stats()
+            # print(self.stats_data)
+
+            # Creating Widgets
+            self.create_widgets()
+        self.wait_for_engine()
+
+    def wait_for_engine(self):
+        self.loading_var.set(self.profile.progress())
+        self.loading_label.configure(text = f'Loading {self.profile.current}...')
+        if self.engine_thread.is_alive():
+            self.after(50, self.wait_for_engine)
+        elif self.engine_error is not None:
+            print(f'Could not load the engine: {self.engine_error!r}', file = sys.stderr)
+            self.close_app()
+        else:
+            self.finish_setup()
+
+    def finish_setup(self):
+        # Word Lists & Target Word
+        self.short_word_list = self.engine.short_word_list
+        self.long_word_list = self.engine.long_word_list
         self.target_word = choice(self.short_word_list)
         # print(self.target_word)
+        self.start_game_log()
 
-        # Json Data
-        with open('data.json') as f:
-            self.json_data = json.load(f)
-        # print(self.json_data)
-
-        # Creating Widgets
-        create_widgets_thread = Thread(target = self.create_widgets)
-        create_widgets_thread.start()
-
-        # Data Frames
-        self.hint_df = self.generate_hint_dataframe()
-        # print(self.hint_df.head())
-        self.updated_hint_df = self.hint_df.copy()
-        # print(f'Hint DataFrame Created. Time: {time.perf_counter()}')
-
-        create_widgets_thread.join()
+        # Solver (remaining candidates) & Hint Worker (the bot's ranking)
+        self.solver = Wordle_Solver(self.engine, metric = self.metric, hard_mode = self.hard_mode)
+        self.hint_worker = Hint_Worker(self.engine, cache_size = self.cache_size)
+        self.hint_worker.start()
+        # the job asking for the rest of a book entry, see rank_all_guesses
+        self.full_generation = None
+        self.after(50, self.poll_hints)
 
         # Expected Info
-        # print(f'Creating Expected Info. Time: {time.perf_counter()}')
-        self.expected_info = {}
-        self.button.configure(state = 'disabled')
-        self.restart.configure(state = 'disabled')
-        self.generate_expected_info() # uncomment this!
-        self.button.configure(state = 'normal')
-        self.restart.configure(state = 'normal')
-        # print(f'Expected Info Created. Time: {time.perf_counter()}')
+        self.generate_expected_info()
+
+        # Key Bindings (bound once the game exists, most reach for the solver)
+        self.bind('<Return>', lambda event: self.apply_word())
+        self.bind('<Alt-KeyPress-a>', lambda event: self.restart_app())
+        self.bind('<Alt-KeyPress-e>', lambda event: self.switch_metric())
+        self.bind('<Alt-KeyPress-l>', lambda event: self.switch_lookahead())
+        self.bind('<Alt-KeyPress-z>', lambda event: self.undo_word())
+        self.bind('<Alt-KeyPress-t>', lambda event: self.switch_trace())
+        self.bind('<Alt-KeyPress-d>', lambda event: self.switch_adversary())
+        self.bind('<Alt-KeyPress-m>', lambda event: self.switch_multi_board())
+        self.bind('<Alt-KeyPress-h>', lambda event: self.switch_hard_mode())
 
         # Destroy Loading Screen
         self.bg_label.destroy()
         self.loading_progress.destroy()
+        self.loading_label.destroy()
 
         # Placing Widegets
         self.hint_frame.place(x = 670, y = 30)
@@ -98,10 +229,13 @@ class Wordle(ctk.CTk):
         self.button.pack()
         self.restart.pack()
         self.switch_widgets_button.place(x = 670, y = 30, anchor = 'ne')
+        if self.open_boards:
+            self.switch_multi_board()
+        self.profile.report()
 
     def create_widgets(self):
         # Hint Frame
-        self.hint_frame = Hint_Frame(self)
+        self.hint_frame = Hint_Frame(self, metric = self.metric, word_length = self.word_length)
 
         # Blank Frame
         self.blank_frame = ctk.CTkFrame(self, width = 302, height = 550, fg_color = 'white', corner_radius = 10, border_width = 3, border_color = 'black')
@@ -112,18 +246,17 @@ class Wordle(ctk.CTk):
 
         # Stats Frame
         self.selected_widget = 'blank'
-        self.stats_frame = Stats_Frame(self, self.json_data)
+        self.stats_frame = Stats_Frame(self, self.stats_data, self.game_history)
 
         # Word Grid
-        self.word_grid = Word_Grid(self)
+        self.word_grid = Word_Grid(self, word_length = self.word_length)
 
         # Word Entry
         self.selected_word = 'Word-1'
         self.word_var = ctk.StringVar(value = '')
         self.word_var.trace_add('write',lambda *args: self.word_validate(selected_word = self.selected_word))
-        self.word_entry = ctk.CTkEntry(self, fg_color = '#3A3A3C', text_color = 'White', textvariable = self.word_var, font = ctk.CTkFont(size = 20), width = 95, border_color = 'black')
-        self.bind('<Return>', lambda event: self.apply_word())
-        self.bind('<Alt-KeyPress-a>', lambda event: self.restart_app())
+        self.word_entry = ctk.CTkEntry(self, fg_color = '#3A3A3C', text_color = 'White', textvariable = self.word_var, font = ctk.CTkFont(size = 20), width = 19 * self.word_length, border_color = 'black')
+        self.entry_border = 'black'
 
         # Buttons
         self.button = ctk.CTkButton(self, text = 'Apply', text_color = 'black', font = ctk.CTkFont(size = 15), command = self.apply_word, width = 80, fg_color = '#77A76B', hover_color = '#52734A')
@@ -134,6 +267,10 @@ class Wordle(ctk.CTk):
 
         # Key Board
         self.key_board = Key_Board(self)
+
+        # Trace Overlay (latency of the last few steps, Alt+T)
+        self.trace_label = ctk.CTkLabel(self, text = '', font = ctk.CTkFont(family = 'Courier', size = 12), justify = 'left', text_color = 'black', fg_color = '#F5E7D1', corner_radius = 5)
+        self.trace_shown = None
         # print(f'Widgets Created. Time: {time.perf_counter()}')
 
     # Switching widgets. Need to work here
@@ -145,9 +282,13 @@ class Wordle(ctk.CTk):
                 self.blank_frame.place_forget()
                 self.stats_frame.place_forget()
                 self.selected_widget = 'hint'
+                self.hints_shown = True
             case 'blank':
                 # print('blank->stats')
                 # self.blank_frame.place_forget()
+                with self.profile.stage('stats plotting'):
+                    self.stats_frame.show()
+                self.update_cache_stats()
                 self.stats_frame.place(x = 670, y = 30)
                 self.selected_widget = 'stats'
             case 'hint':
@@ -156,57 +297,18 @@ class Wordle(ctk.CTk):
                 self.selected_widget = 'blank'
         self.switch_widgets_button.configure(state = 'normal')
 
-    def create_word_list(self, short):
-        short_file = "possible_words.txt"
-        long_file = "allowed_words.txt"
-        if short:    
-            with open(short_file) as fp:
-                word_list = [word.strip() for word in fp.readlines()]
-        else:
-            with open(long_file) as fp:
-                word_list = [word.strip() for word in fp.readlines()]
-
-        return word_list
-
-    def generate_hint_dataframe(self):
-        dataframe = pd.DataFrame({'target': self.short_word_list}, index = self.short_word_list)
-        hint_dict = {}
-        increment = 1/2309
-
-        for guess in self.short_word_list:
-            temp_dict = {}
-            for target in self.short_word_list:
-                temp_dict[target] = self.generate_hint(guess, target)
-
-            self.loading_var.set(self.loading_var.get() + increment)
-            hint_dict[guess] = temp_dict
-
-        temp_df = pd.DataFrame(hint_dict)
-        dataframe = pd.concat([dataframe, temp_df], axis = 1, join = 'inner')
-        return dataframe
-
     def generate_hint(self, guess, target):
-        # print(f'Guess: {guess}, Target: {target}')
-        guess = guess.lower()
-        hint = ['-','-','-','-','-']
-        for i in range(5):
-            if guess[i] == target[i]:
-                hint[i] = 'X'
-            elif guess[i] in target:
-                hint[i] = 'O'
-
-        return ''.join(hint)
-
-    # for words in long_word_list, but outside short_word_list
-    def check_hint(self, x, guess, hint):
-        if self.generate_hint(guess, x) == hint:
-            return True
-        else:
-            return False
+        return self.engine.generate_hint(guess, target)
+
+    def move_target(self, guess):
+        # adversarial mode: the target is redrawn from the bucket the adversary keeps,
+        # so it always agrees with every hint given so far
+        if self.adversary:
+            self.target_word = choice(self.solver.adversary_bucket(guess, self.adversary))
 
     def word_validate(self, *args, selected_word):
         # print(f'var: {var}, index: {index}, mode: {mode}')
-        self.word_entry.configure(state = 'disabled')
+        # the row is redrawn once per idle callback, however many keys arrived before it
         word = self.word_var.get()
         if len(word) != 0:
             if (ord(word[-1]) < 65) or (ord(word[-1]) > 90 and ord(word[-1]) < 97) or (ord(word[-1]) > 122):
@@ -214,87 +316,105 @@ class Wordle(ctk.CTk):
 
             else:
                 word = word.upper()
-                if len(word) > 5:
+                if len(word) > self.word_length:
                     word = word[:-1]
 
-        self.word_var.set(word)
-        self.word_grid.update_labels(word, selected_word)
-        self.word_entry.configure(state = 'normal')
+        if word != self.word_var.get():
+            self.word_var.set(word)
+        self.word_grid.queue_labels(word, selected_word)
+        self.show_word_feedback(word.lower())
+
+    def show_word_feedback(self, word):
+        # entry border: red once no allowed word starts like this (or, in hard mode, the
+        # whole word breaks the hints), orange while allowed words do but none of them
+        # fits the hints so far, green when one does
+        if not word:
+            color = 'black'
+        elif not self.engine.allowed_words.has_prefix(word):
+            color = '#DE4F11'
+        elif word in self.engine.allowed_words and not self.solver.is_legal(word):
+            color = '#DE4F11'
+        elif not self.solver.consistent_words().has_prefix(word):
+            color = '#FFA229'
+        else:
+            color = '#77A76B'
+        if color != self.entry_border:
+            self.entry_border = color
+            self.word_entry.configure(border_color = color)
 
+    @tracer.step('apply word')
     def apply_word(self):
         self.restart.configure(state = 'disabled')
         if self.button.cget('state') == 'normal' or self.button.cget('state') == 'active':
             # print(f"button state in apply word: {self.button.cget('state')}, time: {time.perf_counter()}")
             self.button.configure(state = 'disabled')
-            if (len(self.word_var.get()) == 5) and (self.word_var.get().lower() in self.long_word_list):
+            if (len(self.word_var.get()) == self.word_length) and (self.word_var.get().lower() in self.engine.allowed_words) and self.solver.is_legal(self.word_var.get()):
                 guess = self.word_var.get()
                 word_number = int(self.selected_word[-1])
                                 
                 if word_number != 6:
                     # backend part
+                    self.move_target(guess)
                     hint = self.generate_hint(guess, self.target_word)
 
-                    # guess in short_word_list or not
-                    if guess.lower() in self.short_word_list:
-                        self.updated_hint_df = (self.updated_hint_df[self.updated_hint_df[guess.lower()] == hint])
-                    else:
-                        self.updated_hint_df = self.updated_hint_df.loc[self.updated_hint_df['target'].apply(self.check_hint, guess = guess.lower(), hint = hint)]
+                    # every allowed guess has a pattern row
+                    with tracer.span('filter candidates'):
+                        self.solver.apply(guess, hint)
+                    self.guess_times.append(time.time() - self.game_started)
 
-                    # print(self.updated_hint_df.shape)
                     # show progress
-                    self.hint_frame.update_progress((2309 - self.updated_hint_df.shape[0])/2308)
+                    self.update_game_progress()
 
                     # Thread
                     self.generate_expected_info()
 
                     # frontend part
-                    self.key_board.update_colors(guess, hint)
-                    self.word_grid.update_colors(hint, self.selected_word)
+                    with tracer.span('key board'):
+                        self.key_board.update_colors(guess, hint)
+                    with tracer.span('word grid'):
+                        self.word_grid.update_colors(hint, self.selected_word)
                     word_number += 1
                     self.selected_word = f'{self.selected_word[ :-1]}{str(word_number)}'
                     self.word_var.set('')
 
                     # Win
                     # print(f'Hint: {hint}')
-                    if hint == 'XXXXX':
+                    if hint == self.engine.win_hint:
                         # print(f'You Win. Guess Number: {word_number - 1}')
-                        self.do_if_win(word_number - 1)
+                        self.do_if_win()
                         self.word_entry.configure(state = 'disabled')
                 else:
                     # backend part
+                    self.move_target(guess)
                     hint = self.generate_hint(guess, self.target_word)
 
-                    # guess in short_word_list or not
-                    if guess in self.short_word_list:
-                        self.updated_hint_df = (self.updated_hint_df[self.updated_hint_df[guess.lower()] == hint])
-                    else:
-                        self.updated_hint_df = self.updated_hint_df.loc[self.updated_hint_df['target'].apply(self.check_hint, guess = guess, hint = hint)]
+                    # every allowed guess has a pattern row
+                    with tracer.span('filter candidates'):
+                        self.solver.apply(guess, hint)
+                    self.guess_times.append(time.time() - self.game_started)
 
-                    # print(self.updated_hint_df.shape)
                     # show progress
-                    self.hint_frame.update_progress((2309 - self.updated_hint_df.shape[0])/2308)
+                    self.update_game_progress()
 
                     # Thread
                     self.generate_expected_info()
 
                     # frontend part
-                    self.key_board.update_colors(guess, hint)
-                    self.word_grid.update_colors(self.generate_hint(guess, self.target_word), self.selected_word)
+                    with tracer.span('key board'):
+                        self.key_board.update_colors(guess, hint)
+                    with tracer.span('word grid'):
+                        self.word_grid.update_colors(self.generate_hint(guess, self.target_word), self.selected_word)
                     self.selected_word = ''
                     self.word_var.set('')
 
                     # Win
                     # print(f'Hint: {hint}')
-                    if hint == 'XXXXX':
+                    if hint == self.engine.win_hint:
                         # print(f'You Win. Guess Number: {word_number}')
-                        self.do_if_win(word_number)
+                        self.do_if_win()
                     else:
                         self.word_var.set(self.target_word.upper())
-                        self.json_data['matches_played'] += 1
-                        self.json_data['matches_lost'] += 1
-                        with open("data.json", 'w') as fp:
-                            json.dump(self.json_data, fp, indent = 4)
-                        self.stats_frame.update_labels()
+                        self.finish_game(won = False)
                         
                     self.word_entry.configure(state = 'disabled')
                     
@@ -305,35 +425,173 @@ class Wordle(ctk.CTk):
             self.button.configure(state = 'normal')
         self.restart.configure(state = 'normal')
 
-    def do_if_win(self, word_number):
-        self.json_data['matches_played'] += 1
-        self.json_data['matches_won'] += 1
-        self.json_data['win_indeces'][str(word_number)] += 1
-        with open("data.json", 'w') as fp:
-            json.dump(self.json_data, fp, indent = 4)
-
-        self.stats_frame.update_labels()
-        self.stats_frame.update_bar_plot()
+    @tracer.step('undo')
+    def undo_word(self):
+        # finished games are already in the stats, so only an ongoing game can step back
+        if self.word_entry.cget('state') == 'disabled' or not self.solver.history:
+            return
+        self.solver.undo()
+        self.guess_times.pop()
+
+        # clear the row being typed, then reopen the previous one
+        self.word_var.set('')
+        self.selected_word = f'{self.selected_word[ :-1]}{str(int(self.selected_word[-1]) - 1)}'
+        self.word_grid.update_labels('', self.selected_word)
+
+        # keyboard colors are replayed from the remaining history
+        self.key_board.replay_colors((guess.upper(), hint) for guess, hint in self.solver.history)
+
+        self.update_game_progress()
+        self.generate_expected_info()
+
+    def update_game_progress(self):
+        total = len(self.short_word_list)
+        self.hint_frame.update_progress((total - len(self.solver.candidates))/(total - 1))
+
+    def start_game_log(self):
+        self.game_started = time.time()
+        self.guess_times = []
+        self.hints_shown = self.selected_widget == 'hint'
+
+    def finish_game(self, won):
+        # adversarial games are not comparable, they stay out of the stats
+        if self.adversary:
+            return
+        # one appended row per game (plus its guesses) instead of rewriting a stats file
+        guesses = [(guess, hint, elapsed) for (guess, hint), elapsed in zip(self.solver.history, self.guess_times)]
+        with tracer.span('stats persistence'):
+            self.game_history.record_game(self.target_word, guesses, won, hints_shown = self.hints_shown, started = self.game_started)
+            self.stats_data.update(self.game_history.stats())
+        with tracer.span('stats panel'):
+            self.stats_frame.update_labels()
+            self.stats_frame.update_chart()
+
+    def do_if_win(self):
+        self.finish_game(won = True)
 
     def generate_expected_info(self):
-        # self.button.configure(state = 'disabled')
-        # self.restart.configure(state = 'disabled')
-        self.expected_info = {}
-        if self.updated_hint_df.shape[0] != 1:
-            for word in self.short_word_list:
-                vector = self.updated_hint_df[word].value_counts(normalize = True)
-                self.expected_info[word] = (vector.multiply(1 - vector)).sum()
-
-            self.hint_frame.update_scrollable_frame(self.expected_info)
+        # scoring runs on the hint worker, poll_hints fills the ranking in when it is ready;
+        # a new submit makes any job still in flight stale
+        if len(self.solver.candidates) != 1:
+            self.hint_worker.submit(self.solver.candidates, self.solver.history, self.metric, self.lookahead, self.solver.legal if self.hard_mode else None)
+            self.hint_frame.set_busy(True)
 
         else:
-            self.hint_frame.reset_scrollable_frame()
-            self.hint_frame.update_scrollable_frame({self.updated_hint_df.index[0]: 1})
+            self.hint_worker.cancel()
+            self.hint_frame.set_busy(False)
+            self.hint_frame.reset_ranking()
+            self.hint_frame.show_answer(self.solver.remaining_words()[0])
+
+    def rank_all_guesses(self):
+        # the hint list was scrolled past a book entry: score every allowed guess, and the
+        # lookahead again only if it has not come back yet
+        self.full_generation = self.hint_worker.submit(self.solver.candidates, self.solver.history, self.metric, self.lookahead and not self.hint_frame.lookahead, self.solver.legal if self.hard_mode else None, book = False)
+        self.hint_frame.set_busy(True)
+
+    def poll_hints(self):
+        try:
+            while True:
+                generation, kind, ranking, lookahead = self.hint_worker.results.get_nowait()
+                if self.hint_worker.is_stale(generation):
+                    continue
+                match kind:
+                    case 'book':
+                        with tracer.span('hint frame', kind = kind):
+                            self.hint_frame.set_ranking(ranking, more = self.rank_all_guesses)
+                    case 'rank' if generation == self.full_generation:
+                        with tracer.span('hint frame', kind = kind):
+                            self.hint_frame.extend_ranking(ranking)
+                    case 'rank' | 'lookahead':
+                        with tracer.span('hint frame', kind = kind):
+                            self.hint_frame.set_ranking(ranking, lookahead)
+                    case 'done':
+                        self.hint_frame.set_busy(False)
+                        if self.selected_widget == 'stats':
+                            self.update_cache_stats()
+        except Empty:
+            pass
+        self.update_trace_overlay()
+        self.after(50, self.poll_hints)
+
+    def update_cache_stats(self):
+        # counters of the ranking caches, the multi-board window's included while it is open
+        caches = [self.hint_worker.solver.cache]
+        if self.multi_board is not None:
+            caches.append(self.multi_board.hint_worker.solver.cache)
+        self.stats_frame.update_cache_label(sum(cache.hits for cache in caches), sum(cache.misses for cache in caches), sum(len(cache) for cache in caches), sum(cache.size for cache in caches))
+
+    def update_trace_overlay(self):
+        if self.trace_shown is None or self.trace_shown == tracer.step_count:
+            return
+        self.trace_shown = tracer.step_count
+        lines = [f'{name:<12}{ms:8.1f} ms' for name, ms in reversed(tracer.steps)]
+        self.trace_label.configure(text = '\n'.join(['last steps', *lines]))
+
+    def switch_trace(self):
+        # the overlay turns tracing on; with --trace it keeps recording after it is hidden
+        if self.trace_shown is None:
+            tracer.enabled = True
+            self.trace_shown = -1
+            self.update_trace_overlay()
+            self.trace_label.place(x = 400, y = 50)
+        else:
+            tracer.enabled = self.trace_file is not None
+            self.trace_shown = None
+            self.trace_label.place_forget()
+
+    def close_app(self):
+        if self.multi_board is not None:
+            self.multi_board.close()
+        if hasattr(self, 'hint_worker'):
+            self.hint_worker.stop()
+            self.hint_worker.solver.close()
+        if hasattr(self, 'game_history'):
+            self.game_history.close()
+        if self.trace_file:
+            print(f'Trace written to {tracer.export(self.trace_file)}')
+            for name, count, total, mean in tracer.summary():
+                print(f'{name:<20}{count:>6} x {mean:8.2f} ms = {total:9.1f} ms')
+        self.destroy()
+
+    def switch_metric(self):
+        self.metric = METRICS[(METRICS.index(self.metric) + 1) % len(METRICS)]
+        self.solver.metric = self.metric
+        self.hint_frame.set_metric(self.metric)
+        self.generate_expected_info()
+
+    def switch_adversary(self):
+        # off -> largest bucket -> worst bucket -> off; a new game starts in the new mode
+        modes = (None, *ADVERSARY_RULES)
+        self.adversary = modes[(modes.index(self.adversary) + 1) % len(modes)]
+        self.update_title()
+        self.restart_app()
+
+    def switch_hard_mode(self):
+        # takes effect from the next guess: the solver keeps the legal guesses up to date
+        # in either mode, so nothing has to be recomputed
+        self.hard_mode = not self.hard_mode
+        self.solver.hard_mode = self.hard_mode
+        self.update_title()
+        self.show_word_feedback(self.word_var.get().lower())
+        self.generate_expected_info()
+
+    def update_title(self):
+        modes = [f'adversarial: {self.adversary}'] if self.adversary else []
+        if self.hard_mode:
+            modes.append('hard mode')
+        self.title(f"Wordle ({', '.join(modes)})" if modes else 'Wordle')
+
+    def switch_multi_board(self):
+        if self.multi_board is not None:
+            self.multi_board.close()
+        else:
+            self.multi_board = Multi_Board_Window(self, self.board_count)
 
-        self.expected_info = {}
-        # self.button.configure(state = 'normal')
-        # self.restart.configure(state = 'normal')
+    def switch_lookahead(self):
+        self.lookahead = not self.lookahead
+        self.generate_expected_info()
 
+    @tracer.step('restart')
     def restart_app(self):
         self.button.configure(state = 'disabled')
         if self.restart.cget('state') == 'normal' or self.restart.cget('state') == 'active':
@@ -345,9 +603,10 @@ class Wordle(ctk.CTk):
             self.selected_word = 'Word-1'
             self.target_word = choice(self.short_word_list)
             # print(self.target_word)
+            self.start_game_log()
 
-            # Data Frame
-            self.updated_hint_df = self.hint_df.copy()
+            # Candidates
+            self.solver.restart()
             self.hint_frame.update_progress(0)
 
             # Reset Labels
@@ -363,28 +622,46 @@ class Wordle(ctk.CTk):
 
 
 class Word_Grid(ctk.CTkFrame):
-    def __init__(self, parent):
-        super().__init__(master = parent, fg_color = 'black', height = 330, width = 275, corner_radius = 5)
+    def __init__(self, parent, word_length = WORD_LENGTH, rows = 6, square_size = 53):
+        super().__init__(master = parent, fg_color = 'black', height = (square_size + 2) * rows, width = (square_size + 2) * word_length, corner_radius = 5)
+        self.word_length = word_length
+        self.rows = rows
+        self.square_size = square_size
+        self.pending_labels = {}
         self.columnconfigure(0, weight = 1, uniform = 'a')
-        self.columnconfigure((1,2,3,4,5), weight = 20, uniform = 'a')
-        self.columnconfigure(6, weight = 1, uniform = 'a')
+        self.columnconfigure(tuple(range(1, word_length + 1)), weight = 20, uniform = 'a')
+        self.columnconfigure(word_length + 1, weight = 1, uniform = 'a')
         self.rowconfigure(0, weight = 1, uniform = 'a')
-        self.rowconfigure((1,2,3,4,5,6), weight = 20, uniform = 'a')
-        self.rowconfigure(7, weight = 1, uniform = 'a')
+        self.rowconfigure(tuple(range(1, rows + 1)), weight = 20, uniform = 'a')
+        self.rowconfigure(rows + 1, weight = 1, uniform = 'a')
         self.labels = self.create_labels()
         # self.pack_propagate(0)
         # self.grid_propagate(0)
 
     def create_labels(self):
         label_dict = {}
-        for word in ['Word-1', 'Word-2', 'Word-3', 'Word-4', 'Word-5', 'Word-6']:
+        for row in range(1, self.rows + 1):
+            word = f'Word-{row}'
             label_dict[word] = {}
-            for index in range(5):
-                label_dict[word][index] = Letter_Square(self)
-                label_dict[word][index].grid(row = int(word[-1]), column = index+1, sticky = 'nsew', padx = 1.5, pady = 1.5)
+            for index in range(self.word_length):
+                label_dict[word][index] = Letter_Square(self, self.square_size)
+                label_dict[word][index].grid(row = row, column = index+1, sticky = 'nsew', padx = 1.5, pady = 1.5)
 
         return label_dict
 
+    def queue_labels(self, word, selected_word):
+        # keystrokes that land between two idle callbacks are drawn once
+        if not selected_word:
+            return
+        if not self.pending_labels:
+            self.after_idle(self.flush_labels)
+        self.pending_labels[selected_word] = word
+
+    def flush_labels(self):
+        pending, self.pending_labels = self.pending_labels, {}
+        for selected_word, word in pending.items():
+            self.update_labels(word, selected_word)
+
     def update_labels(self, word, selected_word):
         if selected_word:
             for index in self.labels[selected_word].keys():
@@ -395,7 +672,10 @@ class Word_Grid(ctk.CTkFrame):
 
     def update_colors(self, hint, selected_word):
         # print(hint)
-        for i in range(5):
+        # letters still waiting for the idle callback are drawn first, or they would
+        # repaint the row over its colors
+        self.flush_labels()
+        for i in range(len(hint)):
             match hint[i]:
                 case '-':
                     self.labels[selected_word][i].configure_square(label_color = '#3A3A3C', frame_color = '#3A3A3C')
@@ -405,29 +685,165 @@ class Word_Grid(ctk.CTkFrame):
                     self.labels[selected_word][i].configure_square(label_color = '#528D4D', frame_color = '#528D4D')
 
     def reset_labels(self):
+        self.pending_labels = {}
         for word in self.labels.keys():
-            for i in range(5):
+            for i in range(self.word_length):
                 self.labels[word][i].configure_square(label_color = '#121212', frame_color = '#333333', label_text = '')
 
 
 class Letter_Square(ctk.CTkFrame):
-    def __init__(self, parent):
-        super().__init__(master = parent, fg_color = '#333333', corner_radius = 2, width = 53, height = 53)
+    def __init__(self, parent, size = 53):
+        super().__init__(master = parent, fg_color = '#333333', corner_radius = 2, width = size, height = size)
         self.pack_propagate(0)
         # self.grid_propagate(0)
-        self.label = ctk.CTkLabel(self, text = '', corner_radius = 2, text_color = 'white', fg_color = '#121212', font = ctk.CTkFont(size = 35))
+        self.label = ctk.CTkLabel(self, text = '', corner_radius = 2, text_color = 'white', fg_color = '#121212', font = ctk.CTkFont(size = round(35 * size / 53)))
         self.label.pack(expand = True, fill = 'both', padx = 2, pady = 2)
+        self.label_text, self.label_color, self.frame_color = '', '#121212', '#333333'
 
     def configure_square(self, label_text = None, label_color = '#121212', frame_color = '#333333'):
-        if label_text != None:
+        # the last applied state is remembered, only what changed reaches Tk
+        if label_text != None and label_text != self.label_text:
+            self.label_text = label_text
             self.label.configure(text = label_text)
-        self.label.configure(fg_color = label_color)
-        self.configure(fg_color = frame_color)
+        if label_color != self.label_color:
+            self.label_color = label_color
+            self.label.configure(fg_color = label_color)
+        if frame_color != self.frame_color:
+            self.frame_color = frame_color
+            self.configure(fg_color = frame_color)
+
+
+class Multi_Board_Window(ctk.CTkToplevel):
+    # 2, 4 or 8 targets answered by the same guesses, one small grid per board; the bot
+    # scores every guess jointly over the boards that are still open
+    def __init__(self, parent, boards = 4):
+        super().__init__(master = parent, fg_color = 'white')
+        self.parent = parent
+        self.engine = parent.engine
+        self.boards = boards
+        self.title(f'Wordle x{boards}')
+        self.resizable(False, False)
+        self.solver = Multi_Board_Solver(self.engine, boards, metric = parent.metric)
+        self.hint_worker = Hint_Worker(self.engine, cache_size = parent.cache_size)
+        self.hint_worker.start()
+
+        # Word Grids
+        columns, square_size = BOARD_LAYOUT[boards]
+        grid_frame = ctk.CTkFrame(self, fg_color = 'white')
+        grid_frame.grid(row = 0, column = 0, padx = 10, pady = 10)
+        self.word_grids = []
+        for board in range(boards):
+            word_grid = Word_Grid(grid_frame, self.engine.word_length, rows = self.solver.max_guesses, square_size = square_size)
+            word_grid.grid(row = board // columns, column = board % columns, padx = 4, pady = 4)
+            self.word_grids.append(word_grid)
+
+        # Word Entry & Buttons
+        controls = ctk.CTkFrame(self, fg_color = 'white')
+        controls.grid(row = 1, column = 0, pady = (0, 10))
+        self.word_var = ctk.StringVar(value = '')
+        self.word_var.trace_add('write', lambda *args: self.word_validate())
+        self.word_entry = ctk.CTkEntry(controls, fg_color = '#3A3A3C', text_color = 'White', textvariable = self.word_var, font = ctk.CTkFont(size = 20), width = 19 * self.engine.word_length, border_color = 'black')
+        self.word_entry.pack(side = 'left', padx = 5)
+        ctk.CTkButton(controls, text = 'Apply', text_color = 'black', font = ctk.CTkFont(size = 15), command = self.apply_word, width = 80, fg_color = '#77A76B', hover_color = '#52734A').pack(side = 'left', padx = 5)
+        ctk.CTkButton(controls, text = 'Restart', text_color = 'black', font = ctk.CTkFont(size = 15), command = self.restart, width = 80, fg_color = '#DE4F11', hover_color = '#94350B').pack(side = 'left', padx = 5)
+        self.status_label = ctk.CTkLabel(controls, text = '', text_color = 'black', font = ctk.CTkFont(size = 15))
+        self.status_label.pack(side = 'left', padx = 5)
+
+        # Hint Frame (progress is the share of boards solved)
+        self.hint_frame = Hint_Frame(self, metric = parent.metric, word_length = self.engine.word_length)
+        self.hint_frame.grid(row = 0, column = 1, rowspan = 2, padx = 10, pady = 10, sticky = 'n')
+
+        self.bind('<Return>', lambda event: self.apply_word())
+        self.protocol('WM_DELETE_WINDOW', self.close)
+        self.restart()
+        self.poll_id = self.after(50, self.poll_hints)
+
+    def restart(self):
+        self.targets = sample(self.engine.short_word_list, self.boards)
+        self.solver.restart()
+        self.turn = 1
+        self.word_entry.configure(state = 'normal')
+        self.word_var.set('')
+        for word_grid in self.word_grids:
+            word_grid.reset_labels()
+        self.status_label.configure(text = '')
+        self.hint_frame.update_progress(0)
+        self.generate_hints()
+
+    def word_validate(self):
+        # letters only, upper case, one word long; typed on every open board
+        word = ''.join(letter for letter in self.word_var.get().upper() if 'A' <= letter <= 'Z')[:self.engine.word_length]
+        if word != self.word_var.get():
+            self.word_var.set(word)
+        # a lost game has no row left to type into
+        if self.turn > self.solver.max_guesses:
+            return
+        for board in self.solver.open_boards():
+            self.word_grids[board].queue_labels(word, f'Word-{self.turn}')
+
+    def apply_word(self):
+        guess = self.word_var.get().lower()
+        if self.word_entry.cget('state') == 'disabled' or guess not in self.engine.allowed_words:
+            self.word_entry.configure(text_color = 'Red')
+            self.after(100, lambda: self.word_entry.configure(text_color = 'White'))
+            return
+
+        hints = [None if solved else self.engine.generate_hint(guess, target) for solved, target in zip(self.solver.solved, self.targets)]
+        self.solver.apply(guess, hints)
+        for word_grid, hint in zip(self.word_grids, hints):
+            if hint is not None:
+                word_grid.update_colors(hint, f'Word-{self.turn}')
+        self.turn += 1
+        self.word_var.set('')
+        self.hint_frame.update_progress(sum(self.solver.solved) / self.boards)
+
+        if all(self.solver.solved):
+            self.status_label.configure(text = f'Solved in {len(self.solver.history)}')
+            self.word_entry.configure(state = 'disabled')
+        elif self.turn > self.solver.max_guesses:
+            missed = ' '.join(target.upper() for solved, target in zip(self.solver.solved, self.targets) if not solved)
+            self.status_label.configure(text = f'Missed: {missed}')
+            self.word_entry.configure(state = 'disabled')
+        self.generate_hints()
+
+    def generate_hints(self):
+        if all(self.solver.solved) or self.turn > self.solver.max_guesses:
+            self.hint_worker.cancel()
+            self.hint_frame.set_busy(False)
+            self.hint_frame.reset_ranking()
+            return
+        self.hint_worker.submit([self.solver.candidates[board] for board in self.solver.open_boards()], self.solver.history, self.hint_frame.metric)
+        self.hint_frame.set_busy(True)
+
+    def poll_hints(self):
+        try:
+            while True:
+                generation, kind, ranking, _ = self.hint_worker.results.get_nowait()
+                if self.hint_worker.is_stale(generation):
+                    continue
+                match kind:
+                    case 'rank':
+                        self.hint_frame.score_scale = len(self.solver.open_boards())
+                        self.hint_frame.set_ranking(ranking)
+                    case 'done':
+                        self.hint_frame.set_busy(False)
+        except Empty:
+            pass
+        self.poll_id = self.after(50, self.poll_hints)
+
+    def close(self):
+        self.after_cancel(self.poll_id)
+        self.hint_worker.stop()
+        self.parent.multi_board = None
+        self.destroy()
 
 
 class Hint_Frame(ctk.CTkFrame):
-    def __init__(self, parent):
+    def __init__(self, parent, metric = 'expected_info', word_length = WORD_LENGTH):
         super().__init__(master = parent, width = 302, height = 550, fg_color = 'white', corner_radius = 10)
+        self.metric = metric
+        # entropy bars are scaled to the most a guess can tell: log2 of the pattern count
+        self.max_bits = np.log2(3 ** word_length)
         self.rowconfigure((0,1), weight = 1, uniform = 'a')
         self.rowconfigure(2, weight = 8, uniform = 'a')
         self.pack_propagate(0)
@@ -447,16 +863,33 @@ class Hint_Frame(ctk.CTkFrame):
         # Label
         self.label_frame = ctk.CTkFrame(self, corner_radius = 10, fg_color = '#7ABFAA', border_width = 3, border_color = 'black')
         self.label_frame.grid(row = 1, column = 0, sticky = 'nsew', padx = 2, pady = 2)
-        ctk.CTkLabel(self.label_frame, text  = 'Best Guess\tInfo', font = ctk.CTkFont(size = 20, weight = 'bold'), corner_radius = 10, text_color = 'black', fg_color = '#7ABFAA').pack(expand = True, fill = 'both', padx = 10, pady = 10)
-
-        # Scrollable Frame
-        self.scrollableframe = ctk.CTkScrollableFrame(master = self, width = 271, fg_color = '#7ABFAA', border_width = 3, border_color = 'black', scrollbar_fg_color = 'black')
-        self.scrollableframe.grid(row = 2, column = 0, sticky = 'ns', padx = 2, pady = 4)
-        # print(self.scrollableframe.config())
+        self.header_label = ctk.CTkLabel(self.label_frame, text  = 'Best Guess\tInfo', font = ctk.CTkFont(size = 20, weight = 'bold'), corner_radius = 10, text_color = 'black', fg_color = '#7ABFAA')
+        self.header_label.pack(expand = True, fill = 'both', padx = 10, pady = 10)
+        self.set_metric(metric)
+
+        # Scoring Indicator (shown while the hint worker is busy)
+        self.busy = False
+        self.busy_bar = ctk.CTkProgressBar(self.label_frame, mode = 'indeterminate', width = 200, height = 6, corner_radius = 0, progress_color = '#0D952F', fg_color = '#7ABFAA')
+
+        # Ranked Guesses: HINT_ROWS rows are recycled over the whole ranking
+        self.list_frame = ctk.CTkFrame(self, fg_color = '#7ABFAA', corner_radius = 6, border_width = 3, border_color = 'black')
+        self.list_frame.grid(row = 2, column = 0, sticky = 'nsew', padx = 2, pady = 4)
+        self.rows_frame = ctk.CTkFrame(self.list_frame, fg_color = '#7ABFAA', corner_radius = 0)
+        self.rows_frame.pack(side = 'left', fill = 'y', padx = (5, 0), pady = 6)
+        self.scrollbar = ctk.CTkScrollbar(self.list_frame, command = self.scroll_command, button_color = 'black')
+        self.scrollbar.pack(side = 'right', fill = 'y', padx = 3, pady = 6)
+        self.ranking = Guess_Ranking([], [])
+        self.lookahead = {}
+        self.offset = 0
+        self.more = None
+        # joint multi-board scores are shown per board
+        self.score_scale = 1
 
         # Best Guess Widgets
         self.best_guess_widgets = {}
         self.create_best_guess_widgets()
+        for widget in (self.list_frame, self.rows_frame):
+            self.bind_wheel(widget)
         # print(self.best_guess_widgets)
 
     def update_progress(self, progress):
@@ -464,22 +897,89 @@ class Hint_Frame(ctk.CTkFrame):
         self.game_progress_label.configure(text = f'{(progress*100):.2f}%')
 
     def create_best_guess_widgets(self):
-        for i in range(20):
-            self.best_guess_widgets[i] = Hint_widget(parent = self.scrollableframe)
+        for i in range(HINT_ROWS):
+            self.best_guess_widgets[i] = Hint_widget(parent = self.rows_frame)
+            for widget in (self.best_guess_widgets[i], self.best_guess_widgets[i].label, self.best_guess_widgets[i].bar, self.best_guess_widgets[i].progress_label):
+                self.bind_wheel(widget)
+
+    def bind_wheel(self, widget):
+        # Windows and macOS send <MouseWheel>, X11 sends buttons 4 and 5
+        for sequence in ('<MouseWheel>', '<Button-4>', '<Button-5>'):
+            widget.bind(sequence, self.scroll_wheel)
+
+    def set_ranking(self, ranking, lookahead = None, more = None):
+        # a new ranking starts at the top; a lookahead update keeps the scroll position.
+        # more: asked once for the rest of a partial ranking when it is scrolled past its end
+        if ranking is not self.ranking:
+            self.ranking = ranking
+            self.offset = 0
+            self.more = more
+        self.lookahead = lookahead or {}
+        self.render_rows()
+
+    def extend_ranking(self, ranking):
+        # the rest of a partial ranking arrived: same rows on top, so the scroll position stays
+        self.ranking = ranking
+        self.render_rows()
+
+    def render_rows(self):
+        # only the visible ranks are ordered, and unchanged rows are skipped
+        # two-ply scores sit next to the greedy score; the best one is highlighted
+        best_lookahead = max(self.lookahead, key = self.lookahead.get) if self.lookahead else None
+        page = self.ranking.page(self.offset, HINT_ROWS)
+        for index, widget in self.best_guess_widgets.items():
+            if index < len(page):
+                hint, info = page[index]
+                widget.update_widgets(hint = hint, info = info / self.score_scale, metric = self.metric, lookahead = self.lookahead.get(hint), best = hint == best_lookahead, max_bits = self.max_bits)
+            else:
+                widget.update_widgets()
+        total = max(1, len(self.ranking))
+        self.scrollbar.set(self.offset / total, min(1, (self.offset + HINT_ROWS) / total))
+
+    def scroll_to(self, offset):
+        if self.more is not None and offset + HINT_ROWS > len(self.ranking):
+            more, self.more = self.more, None
+            more()
+        offset = max(0, min(offset, len(self.ranking) - HINT_ROWS))
+        if offset != self.offset:
+            self.offset = offset
+            self.render_rows()
+
+    def scroll_command(self, action, amount, unit = None):
+        # the scrollbar speaks the Tk yview protocol
+        match action:
+            case 'moveto':
+                self.scroll_to(round(float(amount) * len(self.ranking)))
+            case 'scroll':
+                self.scroll_to(self.offset + int(amount) * (HINT_ROWS if unit == 'pages' else 1))
+
+    def scroll_wheel(self, event):
+        self.scroll_to(self.offset + (-3 if event.num == 4 or event.delta > 0 else 3))
+
+    def set_metric(self, metric):
+        self.metric = metric
+        match metric:
+            case 'entropy':
+                self.header_label.configure(text = 'Best Guess\tBits')
+            case _:
+                self.header_label.configure(text = 'Best Guess\tInfo')
+
+    def set_busy(self, busy):
+        if busy == self.busy:
+            return
+        self.busy = busy
+        if busy:
+            self.busy_bar.place(relx = 0.5, rely = 0.88, anchor = 'center')
+            self.busy_bar.start()
+        else:
+            self.busy_bar.stop()
+            self.busy_bar.place_forget()
 
-    def update_scrollable_frame(self, expected_info):
-        # self.reset_scrollable_frame()
-        index = 0
-        for hint, info in sorted(expected_info.items(), key = lambda x: x[1], reverse = True):
-            # print(info)
-            self.best_guess_widgets[index].update_widgets(hint = hint, info = info)
-            index += 1
-            if index >= 20:
-                break
+    def show_answer(self, word):
+        self.best_guess_widgets[0].update_widgets(hint = word, info = 1)
 
-    def reset_scrollable_frame(self):
-        for widget in self.best_guess_widgets.values():
-            widget.update_widgets(hint = '', info = 0)
+    def reset_ranking(self):
+        self.set_ranking(Guess_Ranking([], []))
 
 
 class Hint_widget(ctk.CTkFrame):
@@ -491,42 +991,73 @@ class Hint_widget(ctk.CTkFrame):
 
         self.label = ctk.CTkLabel(self, text = hint, text_color = 'white', width = 80, height = 24, corner_radius = 0, font = ctk.CTkFont(size = 20))
         self.label.pack(side = 'left', padx = 4, pady = 4)
-        ctk.CTkProgressBar(self, variable = self.var, corner_radius = 0, height = 29, progress_color = '#FFA229', fg_color = '#F5E7D1', border_width = 2, border_color = 'black').pack(side = 'right', padx = 4, pady = 4)
+        self.bar = ctk.CTkProgressBar(self, variable = self.var, corner_radius = 0, height = 29, progress_color = '#FFA229', fg_color = '#F5E7D1', border_width = 2, border_color = 'black')
+        self.bar.pack(side = 'right', padx = 4, pady = 4)
         self.progress_label = ctk.CTkLabel(self, text = '', font = ctk.CTkFont(slant = 'italic', weight = 'bold'), height = 16, text_color = 'black')
         self.progress_label.place(x = 122, y = 20, anchor = 'center')
+        self.lookahead_label = ctk.CTkLabel(self, text = '', font = ctk.CTkFont(weight = 'bold'), height = 16, text_color = '#243BEF', fg_color = '#F5E7D1')
+        self.state = (hint, info, 'expected_info', None, False, None)
+        self.label_state = (hint, False)
+        self.lookahead_shown = None
 
         self.pack(pady = 2)
 
-    def update_widgets(self, hint = '', info = 0):
+    def update_widgets(self, hint = '', info = 0, metric = 'expected_info', lookahead = None, best = False, max_bits = np.log2(3 ** WORD_LENGTH)):
         # print(self.label)
-        self.label.configure(text = hint)
+        # an unchanged row is skipped, a changed one only reconfigures the parts that differ
+        state = (hint, info, metric, lookahead, best, max_bits if metric == 'entropy' else None)
+        if state == self.state:
+            return
+        self.state = state
+        if (hint, best) != self.label_state:
+            self.label_state = (hint, best)
+            self.label.configure(text = hint, text_color = '#77E063' if best else 'white')
+        if lookahead != self.lookahead_shown:
+            if lookahead is not None:
+                self.lookahead_label.configure(text = f'{lookahead:.2f}')
+                self.lookahead_label.place(x = 225, y = 20, anchor = 'center')
+            else:
+                self.lookahead_label.place_forget()
+            self.lookahead_shown = lookahead
         if info != 0:
-            self.progress_label.configure(text = f'{info*100:.2f}%', fg_color = '#FFA229')
+            match metric:
+                case 'entropy':
+                    self.progress_label.configure(text = f'{info:.2f} bits', fg_color = '#FFA229')
+                    info = info / max_bits
+                case _:
+                    self.progress_label.configure(text = f'{info*100:.2f}%', fg_color = '#FFA229')
         else:
             self.progress_label.configure(text = '', fg_color = 'white')
         self.var.set(info)
 
 
 class Stats_Frame(ctk.CTkFrame):
-    def __init__(self, parent, json_data = None):
+    def __init__(self, parent, stats_data = None, game_history = None):
         super().__init__(master = parent, width = 302, height = 550, corner_radius = 10, border_width = 3, border_color = 'black')
         self.rowconfigure(0, weight = 1, uniform = 'a')
         self.rowconfigure((1,2), weight = 2, uniform = 'a')
         self.grid_propagate(0)
-        self.data = json_data
+        self.data = stats_data
+        self.game_history = game_history
 
         # Stats Widgets
         self.stats_info_labels = {}
         self.stats_widget = self.create_stats_widget(['matches\nwon', 'matches\nplayed', 'matches\nlost'], [self.data['matches_won'], self.data['matches_played'], self.data['matches_lost']])
         self.stats_widget.grid(row = 0, column = 0, padx = 5, pady = 5)
 
-        # Bar Plot
+        # Chart (built once, when the panel is first shown, then updated in place)
         self.bar_frame = None
-        self.update_bar_plot()
+        self.chart_view = 'wins'
+        self.drawn_state = None
 
         # History Label
         ctk.CTkLabel(self, text = 'Josh Wardle, a software engineer in Brooklyn, \nknew his partner loved word games, so he \ncreated a guessing game for just the two \nof them. As a play on his last name, he named \nit Wordle. But after they played for months,\nand after it rapidly became an obsession in his \nfamily\'s WhatsApp group once he introduced \nit to relatives, Mr. Wardle thought he \nmight be on to something and released it \nto the rest of the world in October. \nOn Nov 1, 90 people played. On a Sunday, \njust over two months later, \nmore than 300,000 people played.').grid(row = 2, column = 0, padx = 5, pady = 7, sticky = 'nsew')
 
+        # Hint Cache Label (filled in by update_cache_label)
+        self.cache_label = ctk.CTkLabel(self, text = '', font = ctk.CTkFont(size = 11), text_color = 'grey')
+        self.cache_label.grid(row = 3, column = 0, padx = 5, sticky = 'ew')
+        self.cache_text = ''
+
     def create_stats_widget(self, label_text_list, number_list):
         match_stats_frame = ctk.CTkFrame(self, width = 292)
         match_stats_frame.columnconfigure((0,1,2), weight = 1, uniform = 'a')
@@ -546,39 +1077,106 @@ class Stats_Frame(ctk.CTkFrame):
         for title, label in self.stats_info_labels.items():
             label.configure(text = str(self.data[title]))
 
-    def update_bar_plot(self):
+    def update_cache_label(self, hits, misses, entries, size):
+        lookups = hits + misses
+        text = f'hint cache: {hits} hits, {misses} misses ({hits / lookups if lookups else 0:.0%}), {entries}/{size} positions'
+        if text != self.cache_text:
+            self.cache_text = text
+            self.cache_label.configure(text = text)
+
+    def show(self):
+        if self.bar_frame is None:
+            self.create_chart()
+        self.update_chart()
+
+    def create_chart(self):
+        # matplotlib is the slowest import in the app, so it waits until the chart is needed
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+
         # Frame
-        if self.bar_frame: self.bar_frame.pack_forget()
         self.bar_frame = ctk.CTkFrame(self)
         self.bar_frame.grid(row = 1, column = 0, sticky = 'nsew', padx = 7)
+        self.view_button = ctk.CTkSegmentedButton(self.bar_frame, values = list(CHART_VIEWS), command = self.switch_chart_view, height = 24)
+        self.view_button.set('Wins')
+        self.view_button.place(x = 5, y = 5)
 
         # Figure
-        figure = plt.Figure()
-        figure.subplots_adjust(left = 0.08, bottom = 0.01, top = 1, right = 0.88)
-        figure.set_facecolor('#3A3A3C')
-        
-        # Graph
-        ax = figure.add_subplot(111)
-        ax.set_facecolor('#3A3A3C')
-        # print(*zip(*self.data['win_indeces'].items()))
-        bars = ax.barh(*zip(*self.data['win_indeces'].items()), color = 'white')
-        ax.set_xlim(0,max(self.data['win_indeces'].values()))
-        for side in ['top', 'bottom', 'left', 'right']:
-            ax.spines[side].set_color('#3A3A3C')
+        self.figure = Figure()
+        self.figure.subplots_adjust(left = 0.08, bottom = 0.01, top = 1, right = 0.88)
+        self.figure.set_facecolor('#3A3A3C')
+
+        # Graph: win distribution bars
+        self.bar_axes = self.figure.add_subplot(111)
+        self.line_axes = self.figure.add_axes(self.bar_axes.get_position(), label = 'history')
+        for ax in (self.bar_axes, self.line_axes):
+            ax.set_facecolor('#3A3A3C')
+            for side in ['top', 'bottom', 'left', 'right']:
+                ax.spines[side].set_color('#3A3A3C')
+            ax.tick_params(colors = 'white', which = 'major')
+        turns = list(self.data['win_indeces'])
+        self.bars = self.bar_axes.barh(turns, [0] * len(turns), color = 'white')
+        self.bar_labels = [self.bar_axes.text(0, i - 0.13, '', color = 'grey') for i in range(len(turns))]
 
         # Configuring the Axes
-        ax.xaxis.set_visible(False)
-        ax.yaxis.set_ticks_position('none')
-        ax.tick_params(colors = 'white', which = 'major')
+        self.bar_axes.xaxis.set_visible(False)
+        self.bar_axes.yaxis.set_ticks_position('none')
 
-        # Bar Label
-        for i, v in enumerate(self.data['win_indeces'].values()):
-            ax.text(v + 0.05, i - 0.13, str(v), color = 'grey')
-        # ax.bar_label(bars, padding = 2, color = 'grey')
+        # Graph: history lines, drawn on the same canvas
+        self.history_line, = self.line_axes.plot([], [], color = 'white')
+        self.history_label = self.line_axes.text(0.03, 0.92, '', color = 'grey', transform = self.line_axes.transAxes)
+        self.line_axes.xaxis.set_visible(False)
+        self.line_axes.set_visible(False)
 
         # widget
-        figure_widget = FigureCanvasTkAgg(figure, master = self.bar_frame)
-        figure_widget.get_tk_widget().place(x = 5, y = 5, width = 348, height = 265)
+        self.canvas = FigureCanvasTkAgg(self.figure, master = self.bar_frame)
+        self.canvas.get_tk_widget().place(x = 5, y = 35, width = 348, height = 235)
+
+    def switch_chart_view(self, value):
+        self.chart_view = CHART_VIEWS[value]
+        self.update_chart()
+
+    def update_chart(self):
+        # only artists change; the canvas is redrawn when what it shows has changed
+        if self.bar_frame is None:
+            return
+        match self.chart_view:
+            case 'wins':
+                state = ('wins', tuple(self.data['win_indeces'].values()))
+            case _:
+                state = (self.chart_view, self.data['matches_played'])
+        if state == self.drawn_state:
+            return
+
+        self.bar_axes.set_visible(self.chart_view == 'wins')
+        self.line_axes.set_visible(self.chart_view != 'wins')
+        match self.chart_view:
+            case 'wins':
+                self.update_bars(state[1])
+            case _:
+                self.update_history_line()
+
+        self.canvas.draw_idle()
+        self.drawn_state = state
+
+    def update_bars(self, values):
+        for bar, label, value in zip(self.bars, self.bar_labels, values):
+            bar.set_width(value)
+            label.set_x(value + 0.05)
+            label.set_text(str(value))
+        self.bar_axes.set_xlim(0, max(max(values), 1))
+
+    def update_history_line(self):
+        played, win_rate, average_guesses = self.game_history.history_series()
+        match self.chart_view:
+            case 'win_rate':
+                values, limits, text = win_rate, (0, 105), 'win rate (%)'
+            case _:
+                values, limits, text = average_guesses, (0, 6.5), 'guesses per game'
+        self.history_line.set_data(played, values)
+        self.history_label.set_text(f'{text}: {values[-1]:.2f}' if values else text)
+        self.line_axes.set_xlim(0, max(played[-1] if played else 1, 1))
+        self.line_axes.set_ylim(*limits)
 
 
 class Key_Board(ctk.CTkFrame):
@@ -586,6 +1184,7 @@ class Key_Board(ctk.CTkFrame):
         super().__init__(master = parent, fg_color = 'transparent', height = 100, width = 330, corner_radius = 5)
         self.key_list = {}
         self.create_key_list()
+        self.key_colors = {letter: '#121212' for letter in self.key_list}
 
         for key in self.key_list.values():
             key.pack(side = 'left', padx = 1)
@@ -610,29 +1209,68 @@ class Key_Board(ctk.CTkFrame):
         frame_3.place(x = 40, y = 66)
         frame_3.pack_propagate(0)
 
+    def set_colors(self, colors):
+        # keys whose color is unchanged are not touched
+        for letter, color in colors.items():
+            if self.key_colors[letter] != color:
+                self.key_colors[letter] = color
+                self.key_list[letter].configure(fg_color = color)
+
     def reset_colors(self):
-        for key in self.key_list.values():
-            key.configure(fg_color = '#121212')
+        self.set_colors(dict.fromkeys(self.key_list, '#121212'))
 
     def update_colors(self, guess, hint):
-        matched_indices = []
-        for i in range(5):
-            match hint[i]:
-                case '-':
-                    self.key_list[guess[i]].configure(fg_color = '#3A3A3C')
-                case 'O':
-                    if self.key_list[guess[i]].cget('fg_color') != '#528D4D':
-                        self.key_list[guess[i]].configure(fg_color = '#B59F3A')
-                case 'X':
-                    matched_indices.append(i)
-        for index in matched_indices:
-            self.key_list[guess[index]].configure(fg_color = '#528D4D')            
+        self.set_colors(next_key_colors(self.key_colors, guess, hint))
+
+    def replay_colors(self, history):
+        # colors are worked out for the whole history, then applied in one pass
+        colors = dict.fromkeys(self.key_list, '#121212')
+        for guess, hint in history:
+            colors.update(next_key_colors(colors, guess, hint))
+        self.set_colors(colors)
+
+
+def next_key_colors(key_colors, guess, hint):
+    # the keys a guess recolors: grey for misses, yellow unless already green, green for hits
+    colors = {}
+    matched_indices = []
+    for i in range(len(hint)):
+        match hint[i]:
+            case '-':
+                colors[guess[i]] = '#3A3A3C'
+            case 'O':
+                if colors.get(guess[i], key_colors[guess[i]]) != '#528D4D':
+                    colors[guess[i]] = '#B59F3A'
+            case 'X':
+                matched_indices.append(i)
+    for index in matched_indices:
+        colors[guess[index]] = '#528D4D'
+
+    return colors
 
 
 
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = 'Wordle with a hint bot.')
+    parser.add_argument('--profile-startup', action = 'store_true', help = 'print how long each startup stage took')
+    parser.add_argument('--adversary', choices = ADVERSARY_RULES, default = None, help = 'no fixed target: every hint keeps the largest (or worst) bucket of candidates')
+    parser.add_argument('--boards', type = int, choices = sorted(BOARD_LAYOUT), default = None, help = 'also open a multi-board game with this many boards (Alt+M toggles it, 4 by default)')
+    parser.add_argument('--trace', default = None, metavar = 'FILE', help = 'record timing spans and write them to FILE (Chrome trace JSON) on exit')
+    parser.add_argument('--length', type = int, default = WORD_LENGTH, help = 'word length; other lengths read possible_words_N.txt and allowed_words_N.txt')
+    parser.add_argument('--possible', default = None, help = 'possible answers word list (overrides --length)')
+    parser.add_argument('--allowed', default = None, help = 'allowed guesses word list (overrides --length)')
+    parser.add_argument('--any-word', action = 'store_true', help = 'every allowed word can be the answer')
+    parser.add_argument('--memory-cap', type = int, default = None, metavar = 'MB', help = 'largest pattern matrix to hold in memory; bigger ones are memory-mapped or streamed')
+    parser.add_argument('--hard', action = 'store_true', help = 'hard mode: every guess must keep the greens and use the yellows revealed so far (Alt+H toggles it)')
+    parser.add_argument('--cache-size', type = int, default = RANKING_CACHE_SIZE, help = 'positions whose rankings are kept for reuse (0 turns the cache off)')
+    args = parser.parse_args()
+    if args.any_word:
+        args.allowed = args.allowed or word_list_files(args.length)[1]
+        args.possible = args.allowed
+    memory_cap = None if args.memory_cap is None else args.memory_cap << 20
+
     ctk.set_appearance_mode('light')
-    Wordle()
+    Wordle(profile_startup = args.profile_startup, word_length = None if args.possible and args.allowed else args.length, word_files = (args.possible, args.allowed), trace_file = args.trace, adversary = args.adversary, boards = args.boards, memory_cap = memory_cap, hard_mode = args.hard, cache_size = args.cache_size)
 
 
@@ -0,0 +1,151 @@
+import os
+import sys
+import json
+import math
+import time
+import random
+import argparse
+import tracemalloc
+import numpy as np
+from wordle_engine import Pattern_Engine, build_pattern_matrix
+from wordle_solver import Wordle_Solver, run_benchmark
+
+BASELINE_FILE = 'bench_baseline.json'
+THRESHOLD = 0.25
+REPEAT = 3
+# a timed run loops a fast stage until it lasts this long
+MIN_RUN_SECONDS = 0.1
+# growth below these is noise, whatever the relative change
+MIN_DELTA = {'seconds': 0.01, 'peak_mb': 1.0}
+SCORE_SIZES = (2309, 500, 100, 20)
+FILTER_POSITIONS = 2000
+HINT_PAIRS = 20000
+
+
+def measure(function, repeat = REPEAT, profile = None):
+    # best of `repeat` timed runs, then one more run under tracemalloc for the peak;
+    # numpy reports its buffers to tracemalloc, so the matrices are counted too.
+    # A stage faster than MIN_RUN_SECONDS is called in a loop and the mean taken, so
+    # millisecond stages are not at the mercy of the scheduler.
+    # profile: what that run calls instead, for a stage whose work is in other processes
+    first = timed(function)
+    loops = max(1, math.ceil(MIN_RUN_SECONDS / max(first, 1e-6)))
+    if loops == 1:
+        seconds = min([first] + [timed(function) for _ in range(repeat - 1)])
+    else:
+        seconds = min(sum(timed(function) for _ in range(loops)) / loops for _ in range(repeat))
+    tracemalloc.start()
+    (profile or function)()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {'seconds': seconds, 'peak_mb': peak / 2**20}
+
+
+def timed(function):
+    # a stage that returns a float has timed itself
+    start_time = time.perf_counter()
+    seconds = function()
+    return seconds if isinstance(seconds, float) else time.perf_counter() - start_time
+
+
+def define_stages(engine, solve_limit = None, processes = None):
+    # name -> (callable, repeats); inputs are drawn once with a fixed seed
+    rng = random.Random(0)
+    targets = engine.short_word_list[:solve_limit]
+    hint_pairs = [(rng.choice(engine.long_word_list), rng.choice(engine.short_word_list)) for _ in range(HINT_PAIRS)]
+    filter_positions = [(guess, engine.generate_hint(guess, target)) for guess, target in hint_pairs[:FILTER_POSITIONS]]
+
+    stages = {
+        'matrix build': (lambda: build_pattern_matrix(engine.long_word_list, engine.short_word_list), REPEAT),
+        'generate hint': (lambda: [engine.generate_hint(guess, target) for guess, target in hint_pairs], REPEAT),
+        'filter': (lambda: [engine.filter_candidates(engine.all_targets, guess, hint) for guess, hint in filter_positions], REPEAT),
+    }
+    for size in SCORE_SIZES:
+        candidates = np.sort(np.array(rng.sample(range(len(engine.short_word_list)), min(size, len(engine.short_word_list))), dtype = engine.all_targets.dtype))
+        stages[f'score {size}'] = (lambda candidates = candidates: engine.ranking(candidates).top(20), REPEAT)
+
+    # end-to-end solves without the opening book, so the numbers do not depend on it;
+    # tracemalloc cannot see worker processes, so the peak always comes from an
+    # in-process solve (one worker's share), and the process count is part of the name
+    processes = processes or os.cpu_count() or 1
+
+    def solve_in_process():
+        solver = Wordle_Solver(engine, book_dir = None)
+        return [solver.play(target) for target in targets]
+
+    def solve():
+        # the benchmark's own clock leaves out its engine load
+        return run_benchmark(targets, processes = processes, short_file = engine.short_file, long_file = engine.long_file, book_dir = None)['seconds']
+    if processes == 1:
+        stages[f'solve {len(targets)} p1'] = (solve_in_process, 1)
+    else:
+        stages[f'solve {len(targets)} p{processes}'] = (solve, 1, solve_in_process)
+
+    return stages
+
+
+def compare(results, baseline, threshold):
+    # a stage regresses when its time or its peak memory grows past the threshold,
+    # and by more than MIN_DELTA
+    regressions = []
+    for name, result in results.items():
+        before = baseline.get(name)
+        if before is None:
+            continue
+        for key in ('seconds', 'peak_mb'):
+            if before[key] > 0 and result[key] > before[key] * (1 + threshold) and result[key] - before[key] > MIN_DELTA[key]:
+                regressions.append((name, key, before[key], result[key]))
+
+    return regressions
+
+
+def print_results(results, baseline):
+    print(f"{'stage':<16}{'seconds':>10}{'peak MB':>10}{'baseline':>10}{'change':>9}")
+    for name, result in results.items():
+        before = baseline.get(name)
+        change = f"{(result['seconds'] / before['seconds'] - 1) * 100:+8.1f}%" if before and before['seconds'] else ''
+        base = f"{before['seconds']:10.4f}" if before else ''
+        print(f"{name:<16}{result['seconds']:10.4f}{result['peak_mb']:10.1f}{base:>10}{change}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description = 'Time and memory-profile the Wordle engine stages against a stored baseline.')
+    parser.add_argument('--baseline', default = BASELINE_FILE, help = 'baseline JSON to compare with (and write with --save)')
+    parser.add_argument('--save', action = 'store_true', help = 'store these results as the new baseline')
+    parser.add_argument('--threshold', type = float, default = THRESHOLD, help = 'allowed slowdown or memory growth per stage, as a fraction')
+    parser.add_argument('--stages', nargs = '*', default = None, help = 'only run stages whose name starts with one of these')
+    parser.add_argument('--solve-limit', type = int, default = None, help = 'only solve the first N targets (default: all)')
+    parser.add_argument('--processes', type = int, default = None, help = 'worker processes for the solve stage (1 to keep it in-process; default: all cores)')
+    args = parser.parse_args()
+
+    engine = Pattern_Engine()
+    stages = define_stages(engine, args.solve_limit, args.processes)
+    if args.stages:
+        stages = {name: stage for name, stage in stages.items() if name.startswith(tuple(args.stages))}
+
+    results = {}
+    for name, (function, repeat, *profile) in stages.items():
+        results[name] = measure(function, repeat, *profile)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as fp:
+            baseline = json.load(fp)['stages']
+    print_results(results, baseline)
+
+    if args.save:
+        with open(args.baseline, 'w') as fp:
+            json.dump({'created': time.time(), 'stages': {**baseline, **results}}, fp, indent = 2)
+        print(f'Baseline written to {args.baseline}')
+        return
+
+    regressions = compare(results, baseline, args.threshold)
+    for name, key, before, after in regressions:
+        print(f'REGRESSION {name}: {key} {before:.4f} -> {after:.4f} (+{(after / before - 1) * 100:.0f}%, limit {args.threshold * 100:.0f}%)')
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
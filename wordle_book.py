@@ -0,0 +1,144 @@
+import os
+import gzip
+import json
+import time
+import argparse
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from wordle_engine import Pattern_Engine, METRICS, WORD_LENGTH, CACHE_DIR, hint_to_pattern
+
+BOOK_DEPTH = 3
+BOOK_WIDTH = 20
+
+
+def book_path(metric, book_dir = CACHE_DIR, word_length = WORD_LENGTH):
+    suffix = '' if word_length == WORD_LENGTH else f'_{word_length}'
+    return os.path.join(book_dir, f'opening_book_{metric}{suffix}.json.gz')
+
+
+def history_key(history):
+    # history is a sequence of (guess index, pattern) pairs
+    return ' '.join(f'{guess}:{pattern}' for guess, pattern in history)
+
+
+class Opening_Book:
+    def __init__(self, engine, metric, positions):
+        self.engine = engine
+        self.metric = metric
+        self.positions = positions
+
+    @classmethod
+    def load(cls, engine, metric, book_dir = CACHE_DIR):
+        # a missing or stale book just means every position is scored live
+        path = book_path(metric, book_dir, engine.word_length)
+        if not os.path.exists(path):
+            return None
+        try:
+            with gzip.open(path, 'rt') as fp:
+                data = json.load(fp)
+        except (OSError, ValueError):
+            return None
+        if data.get('checksum') != engine.checksum or data.get('metric') != metric:
+            return None
+
+        return cls(engine, metric, data['positions'])
+
+    def save(self, book_dir = CACHE_DIR):
+        os.makedirs(book_dir, exist_ok = True)
+        path = book_path(self.metric, book_dir, self.engine.word_length)
+        temp_path = f'{path}.{os.getpid()}.tmp'
+        with gzip.open(temp_path, 'wt') as fp:
+            json.dump({'checksum': self.engine.checksum, 'metric': self.metric, 'positions': self.positions}, fp, separators = (',', ':'))
+        os.replace(temp_path, path)
+
+        return path
+
+    def lookup(self, history):
+        # history as the solver keeps it: (guess word, hint string) pairs
+        try:
+            key = history_key((self.engine.guess_index[guess], hint_to_pattern(hint)) for guess, hint in history)
+        except KeyError:
+            return None
+        ranking = self.positions.get(key)
+        if ranking is None:
+            return None
+
+        return {self.engine.long_word_list[guess]: score for guess, score in ranking}
+
+
+# Build workers: each process opens the mmap-cached matrix once
+worker_engine = None
+
+
+def init_worker(short_file, long_file, cache_dir):
+    global worker_engine
+    worker_engine = Pattern_Engine(short_file, long_file, cache_dir = cache_dir)
+
+
+def candidates_for(engine, history):
+    candidates = engine.all_targets
+    for guess, pattern in history:
+        candidates = engine.filter_pattern(candidates, guess, pattern)
+
+    return candidates
+
+
+def rank_history(history, metric, width):
+    candidates = candidates_for(worker_engine, history)
+    if len(candidates) <= 1:
+        return None
+    ranking = worker_engine.rank_guesses(candidates, metric = metric, limit = width)
+
+    return [[worker_engine.guess_index[word], round(score, 6)] for word, score in ranking.items()]
+
+
+def build_book(engine, metric = 'expected_info', depth = BOOK_DEPTH, width = BOOK_WIDTH, branch = 1, processes = None, verbose = False):
+    # breadth-first over plies: every position reached by one of the `branch` best
+    # guesses of its parent, for every pattern that guess can produce
+    processes = processes or os.cpu_count() or 1
+    positions = {}
+    frontier = [()]
+    with ProcessPoolExecutor(max_workers = processes, initializer = init_worker, initargs = (engine.short_file, engine.long_file, engine.cache_dir)) as executor:
+        for ply in range(depth):
+            start_time = time.perf_counter()
+            chunk_size = max(1, len(frontier) // (processes * 4))
+            rankings = executor.map(rank_history, frontier, [metric] * len(frontier), [width] * len(frontier), chunksize = chunk_size)
+
+            next_frontier = []
+            for history, ranking in zip(frontier, rankings):
+                if ranking is None:
+                    continue
+                positions[history_key(history)] = ranking
+                if ply + 1 == depth:
+                    continue
+                candidates = candidates_for(engine, history)
+                for guess, _ in ranking[:branch]:
+                    for pattern in np.unique(engine.pattern_block([guess], candidates)[0]):
+                        if pattern != engine.win_pattern:
+                            next_frontier.append(history + ((guess, int(pattern)),))
+
+            if verbose:
+                print(f'ply {ply + 1}: {len(frontier)} positions in {time.perf_counter() - start_time:.2f}s')
+            frontier = next_frontier
+
+    return Opening_Book(engine, metric, positions)
+
+
+def main():
+    parser = argparse.ArgumentParser(description = 'Precompute the opening book the Wordle bot consults before scoring live.')
+    parser.add_argument('--metric', choices = METRICS, default = 'expected_info')
+    parser.add_argument('--depth', type = int, default = BOOK_DEPTH, help = 'number of plies to store')
+    parser.add_argument('--width', type = int, default = BOOK_WIDTH, help = 'ranked guesses kept per position')
+    parser.add_argument('--branch', type = int, default = 1, help = 'best guesses expanded per position')
+    parser.add_argument('--processes', type = int, default = None, help = 'worker processes (default: all cores)')
+    parser.add_argument('--length', type = int, default = WORD_LENGTH, help = 'word length; other lengths read possible_words_N.txt and allowed_words_N.txt')
+    args = parser.parse_args()
+
+    engine = Pattern_Engine(word_length = args.length, processes = args.processes)
+    book = build_book(engine, args.metric, args.depth, args.width, args.branch, args.processes, verbose = True)
+    path = book.save()
+    print(f'{len(book.positions)} positions written to {path} ({os.path.getsize(path) / 1024:.1f} KB)')
+
+
+if __name__ == '__main__':
+    main()
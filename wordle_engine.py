@@ -0,0 +1,596 @@
+import os
+import hashlib
+import multiprocessing
+import tempfile
+import numpy as np
+from bisect import bisect_left
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+# A hint is stored as one base-3 number: position i contributes digit * 3**i,
+# where '-' -> 0 (not in target), 'O' -> 1 (elsewhere in target), 'X' -> 2 (right spot)
+HINT_SYMBOLS = '-OX'
+WORD_LENGTH = 5
+MIN_WORD_LENGTH = 4
+MAX_WORD_LENGTH = 8
+PATTERN_COUNT = 3 ** WORD_LENGTH
+WIN_PATTERN = PATTERN_COUNT - 1
+CACHE_DIR = 'pattern_cache'
+METRICS = ('expected_info', 'entropy')
+ADVERSARY_RULES = ('largest', 'worst')
+ADVERSARY_BEAM = 4
+SCORE_CHUNK_CELLS = 1 << 20
+# rough working memory per block cell while scoring (patterns, sorted copy, run starts
+# and offsets), used to size chunks under a memory cap
+SCORE_CELL_BYTES = 16
+# numpy sorts without the GIL, so chunks of guesses score on several threads
+SCORE_THREADS = os.cpu_count() or 1
+BUILD_CHUNK_CELLS = 1 << 21
+# a full ranking holds ~115 kB of scores, so the default cache stays around 15 MB
+RANKING_CACHE_SIZE = 128
+# below this many cells a single process builds the matrix faster than a pool starts
+PARALLEL_BUILD_CELLS = 1 << 26
+
+
+def word_list_files(word_length = WORD_LENGTH):
+    if word_length == WORD_LENGTH:
+        return 'possible_words.txt', 'allowed_words.txt'
+    return f'possible_words_{word_length}.txt', f'allowed_words_{word_length}.txt'
+
+
+def pattern_dtype(word_length):
+    # 3**5 = 243 patterns fit in a byte, 6 to 10 letters need two
+    return np.min_scalar_type(3 ** word_length - 1)
+
+
+def load_word_list(file_name):
+    with open(file_name) as fp:
+        word_list = [word.strip().lower() for word in fp.readlines() if word.strip()]
+
+    return word_list
+
+
+def encode_words(word_list):
+    letters = np.frombuffer(''.join(word_list).encode('ascii'), dtype = np.uint8)
+    return letters.reshape(len(word_list), -1) - ord('a')
+
+
+def hint_to_pattern(hint):
+    pattern = 0
+    for i, symbol in enumerate(hint):
+        pattern += HINT_SYMBOLS.index(symbol) * 3**i
+
+    return pattern
+
+
+def pattern_to_hint(pattern, word_length = WORD_LENGTH):
+    hint = []
+    for i in range(word_length):
+        hint.append(HINT_SYMBOLS[pattern % 3])
+        pattern //= 3
+
+    return ''.join(hint)
+
+
+def letter_presence(codes):
+    # letters present anywhere in each word, one row per word
+    present = np.zeros((len(codes), 26), dtype = bool)
+    present[np.arange(len(codes))[:, None], codes] = True
+
+    return present
+
+
+def compute_patterns(guesses, targets, target_letters):
+    # patterns of encoded guesses (rows) against encoded targets (columns)
+    word_length = guesses.shape[1]
+    dtype = pattern_dtype(word_length)
+    patterns = np.zeros((len(guesses), len(targets)), dtype = dtype)
+    for i in range(word_length):
+        exact = guesses[:, i, None] == targets[None, :, i]
+        present = target_letters[:, guesses[:, i]].T
+        patterns += np.where(exact, 2, present).astype(dtype) * dtype.type(3**i)
+
+    return patterns
+
+
+def build_pattern_matrix(guess_list, target_list, chunk_size = None, progress = None):
+    guesses = encode_words(guess_list)
+    targets = encode_words(target_list)
+    target_letters = letter_presence(targets)
+    chunk_size = chunk_size or max(1, BUILD_CHUNK_CELLS // max(1, len(targets)))
+
+    matrix = np.empty((len(guesses), len(targets)), dtype = pattern_dtype(guesses.shape[1]))
+    for start in range(0, len(guesses), chunk_size):
+        chunk = guesses[start:start + chunk_size]
+        matrix[start:start + len(chunk)] = compute_patterns(chunk, targets, target_letters)
+
+        if progress:
+            progress((start + len(chunk)) / len(guesses))
+
+    return matrix
+
+
+def map_chunks(function, count, chunk_size):
+    # function(start) for every chunk of `count` rows; numpy gathers and sorts without
+    # the GIL, so several chunks run at once on SCORE_THREADS threads
+    starts = range(0, count, chunk_size)
+    if SCORE_THREADS > 1 and len(starts) > 1:
+        with ThreadPoolExecutor(max_workers = min(SCORE_THREADS, len(starts))) as executor:
+            list(executor.map(function, starts))
+    else:
+        for start in starts:
+            function(start)
+
+
+# Build workers: each fills a slice of guess rows straight into the shared output file
+build_job = None
+
+
+def init_build_worker(guess_list, target_list, path):
+    global build_job
+    build_job = (guess_list, target_list, path)
+
+
+def build_rows(start, stop):
+    guess_list, target_list, path = build_job
+    matrix = np.lib.format.open_memmap(path, mode = 'r+')
+    matrix[start:stop] = build_pattern_matrix(guess_list[start:stop], target_list)
+    matrix.flush()
+    del matrix
+
+    return stop - start
+
+
+def build_pattern_file(guess_list, target_list, path, processes = None, progress = None):
+    # chunks of rows are spread over the cores; the file is the only copy of the matrix
+    matrix = np.lib.format.open_memmap(path, mode = 'w+', dtype = pattern_dtype(len(guess_list[0])), shape = (len(guess_list), len(target_list)))
+    del matrix
+
+    processes = processes or os.cpu_count() or 1
+    built = 0
+    if processes == 1:
+        # a single process streams chunks into the file, never holding the whole matrix
+        init_build_worker(guess_list, target_list, path)
+        chunk_rows = max(1, BUILD_CHUNK_CELLS // max(1, len(target_list)))
+        for start in range(0, len(guess_list), chunk_rows):
+            built += build_rows(start, min(start + chunk_rows, len(guess_list)))
+            if progress:
+                progress(built / len(guess_list))
+        return
+
+    # spawned, not forked: the app builds from its engine-loading thread
+    chunk_rows = max(1, -(-len(guess_list) // (processes * 8)))
+    with ProcessPoolExecutor(max_workers = processes, mp_context = multiprocessing.get_context('spawn'), initializer = init_build_worker, initargs = (guess_list, target_list, path)) as executor:
+        futures = [executor.submit(build_rows, start, min(start + chunk_rows, len(guess_list))) for start in range(0, len(guess_list), chunk_rows)]
+        for future in as_completed(futures):
+            built += future.result()
+            if progress:
+                progress(built / len(guess_list))
+
+
+def word_list_checksum(*file_names):
+    digest = hashlib.sha256()
+    for file_name in file_names:
+        with open(file_name, 'rb') as fp:
+            digest.update(fp.read())
+        digest.update(b'\0')
+
+    return digest.hexdigest()[:16]
+
+
+def load_pattern_matrix(guess_list, target_list, checksum, cache_dir = CACHE_DIR, progress = None, name = 'words', processes = None, memory_cap = None):
+    # cached matrices are memory-mapped read-only, so every process shares the same pages;
+    # `name` tells dictionaries apart, so only stale copies of the same one are pruned.
+    # A matrix over memory_cap bytes is streamed into the file and never held in memory
+    path = os.path.join(cache_dir, f'patterns_{name}_{checksum}.npy')
+    shape = (len(guess_list), len(target_list))
+    dtype = pattern_dtype(len(guess_list[0]))
+    if os.path.exists(path):
+        try:
+            matrix = np.load(path, mmap_mode = 'r')
+            if matrix.shape == shape and matrix.dtype == dtype:
+                if progress:
+                    progress(1)
+                return matrix
+        except (OSError, ValueError):
+            pass
+
+    over_cap = memory_cap is not None and shape[0] * shape[1] * dtype.itemsize > memory_cap
+    parallel = processes != 1 and shape[0] * shape[1] >= PARALLEL_BUILD_CELLS
+    streamed = parallel or over_cap
+    matrix = None if streamed else build_pattern_matrix(guess_list, target_list, progress = progress)
+
+    # write to a private temp file and rename it into place, so a concurrent
+    # builder never sees a half-written file and the last rename simply wins
+    try:
+        os.makedirs(cache_dir, exist_ok = True)
+        fd, temp_path = tempfile.mkstemp(prefix = 'patterns_', suffix = '.tmp', dir = cache_dir)
+        try:
+            with os.fdopen(fd, 'wb') as fp:
+                if not streamed:
+                    np.save(fp, matrix)
+            if streamed:
+                build_pattern_file(guess_list, target_list, temp_path, processes if parallel else 1, progress)
+            os.replace(temp_path, path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        matrix = np.load(path, mmap_mode = 'r')
+    except OSError:
+        # read-only or locked cache dir: keep the in-memory matrix, or none over the cap
+        if matrix is None and not over_cap:
+            matrix = build_pattern_matrix(guess_list, target_list, progress = progress)
+        return matrix
+
+    # unnamed files are caches written before word lists were named
+    for prefix in (f'patterns_{name}_', 'patterns_'):
+        prune_pattern_cache(cache_dir, keep = path, prefix = prefix)
+    return matrix
+
+
+def prune_pattern_cache(cache_dir, keep, prefix = 'patterns_'):
+    # only '{prefix}{checksum}.npy': 'possible_words_6' must not prune 'possible_words' caches
+    for file_name in os.listdir(cache_dir):
+        path = os.path.join(cache_dir, file_name)
+        checksum = file_name[len(prefix):-len('.npy')]
+        if file_name.startswith(prefix) and file_name.endswith('.npy') and '_' not in checksum and path != keep:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def bucket_scores(sizes, total, metric = 'expected_info'):
+    # contribution of each pattern bucket to a guess score
+    vector = sizes / total
+    match metric:
+        case 'expected_info':
+            # chance that a random pair of candidates lands in different buckets
+            return vector * (1 - vector)
+        case 'entropy':
+            # Shannon entropy of the pattern distribution, in bits
+            return -vector * np.log2(vector)
+        case _:
+            raise ValueError(f'Unknown metric: {metric}. Expected one of {METRICS}')
+
+
+def score_block(block, metric = 'expected_info', board_sizes = None, board_weights = None):
+    # block[g] holds the patterns guess g gives over the candidates; after sorting
+    # each row the bucket sizes are its run lengths, so no per-pattern bins are needed.
+    # With board_sizes the columns hold several boards side by side, their patterns
+    # offset per board so runs never cross boards, and a row scores the weighted sum
+    rows, total = block.shape
+    ordered = np.sort(block, axis = 1, kind = 'stable')
+    starts = np.ones(ordered.shape, dtype = bool)
+    starts[:, 1:] = ordered[:, 1:] != ordered[:, :-1]
+    positions = np.flatnonzero(starts.ravel())
+    sizes = np.diff(np.append(positions, starts.size))
+    if board_sizes is None:
+        return np.bincount(positions // total, weights = bucket_scores(sizes, total, metric), minlength = rows)
+
+    board_sizes = np.asarray(board_sizes)
+    boards = np.searchsorted(np.cumsum(board_sizes), positions % total, side = 'right')
+    weights = bucket_scores(sizes, board_sizes[boards], metric) * np.asarray(board_weights)[boards]
+
+    return np.bincount(positions // total, weights = weights, minlength = rows)
+
+
+def fingerprint(indices):
+    # short digest of an index array; candidate sets are narrowed in order, so the same
+    # words always give the same bytes, whatever history led to them
+    return hashlib.blake2b(indices.tobytes(), digest_size = 16).digest()
+
+
+class Prefix_Index:
+    # A set for whole words and a sorted list for prefixes: one bisect tells
+    # whether any word starts with what has been typed so far
+    def __init__(self, words):
+        self.words = sorted(words)
+        self.word_set = set(self.words)
+
+    def __contains__(self, word):
+        return word in self.word_set
+
+    def __len__(self):
+        return len(self.words)
+
+    def has_prefix(self, prefix):
+        index = bisect_left(self.words, prefix)
+        return index < len(self.words) and self.words[index].startswith(prefix)
+
+
+class Guess_Ranking:
+    # Scored guesses, ordered on demand: best score first, then lower `ties` first.
+    # page() partitions around the ranks it is asked for and sorts only those, so
+    # showing the top of 13k guesses never sorts the rest.
+    def __init__(self, words, scores, ties = None):
+        self.words = words
+        self.scores = np.asarray(scores, dtype = float)
+        self.ties = np.arange(len(self.scores)) if ties is None else ties
+
+    @classmethod
+    def from_dict(cls, ranking):
+        # an already ordered {word: score}, e.g. a book entry
+        return cls(list(ranking), list(ranking.values()))
+
+    def __len__(self):
+        return len(self.scores)
+
+    def order(self, start, stop):
+        # indices into words/scores of ranks start..stop-1
+        start, stop = max(0, start), min(len(self), stop)
+        if start >= stop:
+            return np.empty(0, dtype = np.intp)
+        negated = -self.scores
+        bounds = np.partition(negated, [start, stop - 1])
+        low, high = bounds[start], bounds[stop - 1]
+        # everything scored between the two boundary ranks, ties included, gets sorted
+        inside = np.flatnonzero((negated >= low) & (negated <= high))
+        inside = inside[np.lexsort((self.ties[inside], negated[inside]))]
+        ahead = np.count_nonzero(negated < low)
+
+        return inside[start - ahead:stop - ahead]
+
+    def page(self, start, count):
+        return [(self.words[index], float(self.scores[index])) for index in self.order(start, start + count)]
+
+    def top(self, count = None):
+        return dict(self.page(0, len(self) if count is None else count))
+
+
+class Ranking_Cache:
+    # Rankings of recently seen positions, least recently used evicted first. Keys are
+    # built from fingerprints of the candidate sets, so positions reached by different
+    # histories share an entry; size = 0 turns the cache off but keeps the counters
+    def __init__(self, size = RANKING_CACHE_SIZE):
+        self.size = size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key, compute):
+        ranking = self.entries.get(key)
+        if ranking is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return ranking
+        self.misses += 1
+        ranking = compute()
+        if self.size > 0:
+            self.entries[key] = ranking
+            if len(self.entries) > self.size:
+                self.entries.popitem(last = False)
+
+        return ranking
+
+
+class Pattern_Engine:
+    def __init__(self, short_file = None, long_file = None, cache_dir = CACHE_DIR, progress = None, build = True, word_length = None, processes = None, memory_cap = None):
+        # Word Lists (the length comes from the lists unless it is given)
+        default_short, default_long = word_list_files(word_length or WORD_LENGTH)
+        self.short_file = short_file or default_short
+        self.long_file = long_file or default_long
+        self.cache_dir = cache_dir
+        self.processes = processes
+        self.memory_cap = memory_cap
+        self.short_word_list = load_word_list(self.short_file)
+        self.long_word_list = load_word_list(self.long_file)
+        self.word_length = word_length or len(self.short_word_list[0])
+        if not MIN_WORD_LENGTH <= self.word_length <= MAX_WORD_LENGTH:
+            raise ValueError(f'Word length must be between {MIN_WORD_LENGTH} and {MAX_WORD_LENGTH}, got {self.word_length}')
+        for file_name, word_list in ((self.short_file, self.short_word_list), (self.long_file, self.long_word_list)):
+            wrong = [word for word in word_list if len(word) != self.word_length or not word.isascii() or not word.isalpha()]
+            if wrong:
+                raise ValueError(f'{file_name} has words that are not {self.word_length} letters a-z: {wrong[:5]}')
+
+        # Patterns
+        self.pattern_count = 3 ** self.word_length
+        self.win_pattern = self.pattern_count - 1
+        self.win_hint = 'X' * self.word_length
+        # 2 per green and 1 per yellow, the adversary's tie-break between equal buckets
+        self.pattern_strength = sum(np.arange(self.pattern_count) // 3**i % 3 for i in range(self.word_length))
+        self.guess_index = {word: index for index, word in enumerate(self.long_word_list)}
+        self.target_index = {word: index for index, word in enumerate(self.short_word_list)}
+        self.allowed_words = Prefix_Index(self.long_word_list)
+
+        # short words are guessable too, so every target must have a guess row
+        missing = [word for word in self.short_word_list if word not in self.guess_index]
+        if missing:
+            raise ValueError(f'{self.short_file} has words missing from {self.long_file}: {missing[:5]}')
+
+        # candidate sets are narrowed copies of this shared, read-only index array
+        self.all_targets = np.arange(len(self.short_word_list), dtype = np.min_scalar_type(len(self.short_word_list)))
+        self.all_targets.setflags(write = False)
+        self.all_guesses = np.arange(len(self.long_word_list), dtype = np.min_scalar_type(len(self.long_word_list)))
+        self.all_guesses.setflags(write = False)
+        self.target_guess_index = np.array([self.guess_index[word] for word in self.short_word_list])
+
+        # encoded letters, for pattern blocks computed without a matrix and hard-mode checks
+        self.guess_codes = encode_words(self.long_word_list)
+        self.guess_letters = letter_presence(self.guess_codes)
+        self.target_codes = encode_words(self.short_word_list)
+        self.target_letters = letter_presence(self.target_codes)
+        # cells per scored chunk: the default, or fewer so every thread's chunk fits the cap
+        self.chunk_cells = SCORE_CHUNK_CELLS
+        if memory_cap is not None:
+            self.chunk_cells = max(1 << 12, min(SCORE_CHUNK_CELLS, memory_cap // (SCORE_CELL_BYTES * SCORE_THREADS)))
+
+        # build = False leaves the (slow) matrix for an explicit load_matrix() call
+        self.checksum = word_list_checksum(self.short_file, self.long_file)
+        self.matrix = None
+        if build:
+            self.load_matrix(progress)
+
+    def load_matrix(self, progress = None):
+        # Pattern Matrix: rows are guesses (long list), columns are targets (short list).
+        # Over memory_cap it is memory-mapped from the cache, or with no cache not built at
+        # all: pattern_block then computes every block as it is scored
+        matrix_bytes = len(self.long_word_list) * len(self.short_word_list) * pattern_dtype(self.word_length).itemsize
+        if self.cache_dir:
+            name = os.path.splitext(os.path.basename(self.short_file))[0]
+            self.matrix = load_pattern_matrix(self.long_word_list, self.short_word_list, self.checksum, cache_dir = self.cache_dir, progress = progress, name = name, processes = self.processes, memory_cap = self.memory_cap)
+        elif self.memory_cap is not None and matrix_bytes > self.memory_cap:
+            self.matrix = None
+            if progress:
+                progress(1)
+        else:
+            self.matrix = build_pattern_matrix(self.long_word_list, self.short_word_list, progress = progress)
+
+    def pattern_block(self, rows, candidates):
+        # patterns of guess rows (an index array or a slice) against candidate columns;
+        # only the cells asked for are gathered, so a mapped matrix pages in just those rows
+        if self.matrix is None:
+            return compute_patterns(self.guess_codes[rows], self.target_codes[candidates], self.target_letters[candidates])
+        if isinstance(rows, slice):
+            return np.take(self.matrix[rows], candidates, axis = 1)
+        return self.matrix[np.ix_(rows, candidates)]
+
+    def generate_hint(self, guess, target):
+        guess = guess.lower()
+        target = target.lower()
+        hint = ['-'] * self.word_length
+        for i in range(self.word_length):
+            if guess[i] == target[i]:
+                hint[i] = 'X'
+            elif guess[i] in target:
+                hint[i] = 'O'
+
+        return ''.join(hint)
+
+    def pattern_row(self, guess):
+        return self.pattern_block([self.guess_index[guess.lower()]], self.all_targets)[0]
+
+    def filter_candidates(self, candidates, guess, hint):
+        return self.filter_pattern(candidates, self.guess_index[guess.lower()], hint_to_pattern(hint))
+
+    def filter_pattern(self, candidates, guess_index, pattern):
+        return candidates[self.pattern_block([guess_index], candidates)[0] == pattern]
+
+    def legal_guesses(self, legal, guess_index, pattern):
+        # hard mode: narrows the legal guess indices to those that keep every green of
+        # this pattern in place and use every yellow letter somewhere; a pattern without
+        # either keeps the same array, no copy
+        if not any(pattern // 3**i % 3 for i in range(self.word_length)):
+            return legal
+        codes = self.guess_codes[guess_index]
+        keep = np.ones(len(legal), dtype = bool)
+        for i in range(self.word_length):
+            match pattern // 3**i % 3:
+                case 2:
+                    keep &= self.guess_codes[legal, i] == codes[i]
+                case 1:
+                    keep &= self.guess_letters[legal, codes[i]]
+
+        return legal[keep]
+
+    def candidate_words(self, candidates):
+        return [self.short_word_list[index] for index in candidates]
+
+    def score_boards(self, candidate_sets, metric = 'expected_info', guesses = None):
+        # joint score over several boards: the per-board scores summed, plus each board's
+        # chance that the guess is its answer. Boards are scored together in one block per
+        # chunk of guesses, and boards with the same candidates are scored once and weighted
+        if guesses is None:
+            guesses = self.all_guesses
+        boards = {}
+        for candidates in candidate_sets:
+            key = candidates.tobytes()
+            count = boards.get(key, (candidates, 0))[1]
+            boards[key] = (candidates, count + 1)
+        sets = [candidates for candidates, _ in boards.values()]
+        board_weights = np.array([count for _, count in boards.values()], dtype = float)
+        board_sizes = np.array([len(candidates) for candidates in sets])
+        columns = np.concatenate(sets)
+        # the smallest key type keeps numpy's radix sort (up to 16 bits) in play
+        key_type = np.min_scalar_type(len(sets) * self.pattern_count - 1)
+        offsets = np.repeat(np.arange(len(sets), dtype = key_type) * key_type.type(self.pattern_count), board_sizes)
+
+        scores = np.empty(len(guesses))
+        chunk_size = max(1, self.chunk_cells // len(columns))
+
+        def score_chunk(start):
+            rows = guesses[start:start + chunk_size]
+            block = self.pattern_block(rows, columns).astype(key_type) + offsets
+            scores[start:start + len(rows)] = score_block(block, metric, board_sizes, board_weights)
+
+        map_chunks(score_chunk, len(guesses), chunk_size)
+
+        solve_chance = np.zeros(len(self.long_word_list))
+        for candidates, weight in zip(sets, board_weights):
+            solve_chance[self.target_guess_index[candidates]] += weight / len(candidates)
+
+        return scores + solve_chance[guesses]
+
+    def board_ranking(self, candidate_sets, metric = 'expected_info'):
+        # on ties the guess that is a candidate on more boards goes first
+        scores = self.score_boards(candidate_sets, metric)
+        candidate_boards = np.zeros(len(self.long_word_list))
+        for candidates in candidate_sets:
+            candidate_boards[self.target_guess_index[candidates]] += 1
+
+        return Guess_Ranking(self.long_word_list, scores, -candidate_boards)
+
+    def adversary_pattern(self, candidates, guess_index, rule = 'largest'):
+        # the feedback an adversary answers with: the pattern that keeps the most candidates
+        # ('largest'), or among the ADVERSARY_BEAM largest the one where the best next guess
+        # still leaves the most words on average ('worst', by expected-info score);
+        # the win pattern only when the guess is the last candidate. 'worst' only tries the
+        # bucket's own words as next guesses: bucket x bucket cells instead of every allowed
+        # guess, cheap enough for the Tk thread
+        patterns = self.pattern_block([guess_index], candidates)[0]
+        counts = np.bincount(patterns, minlength = self.pattern_count)
+        if counts[self.win_pattern] < len(candidates):
+            counts[self.win_pattern] = 0
+        order = np.lexsort((self.pattern_strength, -counts))
+        match rule:
+            case 'largest':
+                return int(order[0])
+            case 'worst':
+                beam = [pattern for pattern in order[:ADVERSARY_BEAM] if counts[pattern]]
+                buckets = [candidates[patterns == pattern] for pattern in beam]
+                remaining = [len(bucket) * (1 - self.score_guesses(bucket, guesses = self.target_guess_index[bucket]).max()) for bucket in buckets]
+                return int(beam[int(np.argmax(remaining))])
+            case _:
+                raise ValueError(f'Unknown adversary rule: {rule}')
+
+    def consistent_guesses(self, history):
+        # allowed words that would have produced every hint so far; the matrix only has
+        # possible answers as columns, so these rows are computed directly
+        consistent = np.ones(len(self.long_word_list), dtype = bool)
+        for guess, hint in history:
+            consistent &= build_pattern_matrix([guess.lower()], self.long_word_list)[0] == hint_to_pattern(hint)
+
+        return [self.long_word_list[index] for index in np.flatnonzero(consistent)]
+
+    def score_guesses(self, candidates, metric = 'expected_info', guesses = None):
+        # scored in chunks of guess rows, so only one block per thread exists at a time;
+        # all guesses go by slices, which read the matrix without copying whole rows
+        count = len(self.long_word_list) if guesses is None else len(guesses)
+        scores = np.empty(count)
+        chunk_size = max(1, self.chunk_cells // max(1, len(candidates)))
+
+        def score_chunk(start):
+            stop = min(start + chunk_size, count)
+            rows = slice(start, stop) if guesses is None else guesses[start:stop]
+            scores[start:stop] = score_block(self.pattern_block(rows, candidates), metric)
+
+        map_chunks(score_chunk, count, chunk_size)
+        return scores
+
+    def ranking(self, candidates, metric = 'expected_info', guesses = None):
+        # best score first; on ties a guess that could still be the target goes first
+        words = self.long_word_list if guesses is None else [self.long_word_list[guess] for guess in guesses]
+        scores = self.score_guesses(candidates, metric, guesses)
+        if guesses is None:
+            guesses = self.all_guesses
+        is_candidate = np.zeros(len(self.long_word_list), dtype = bool)
+        is_candidate[self.target_guess_index[candidates]] = True
+
+        return Guess_Ranking(words, scores, ~is_candidate[guesses])
+
+    def rank_guesses(self, candidates, metric = 'expected_info', guesses = None, limit = None):
+        # ordered {word: score}; with a limit only the best `limit` guesses are sorted
+        return self.ranking(candidates, metric, guesses).top(limit)
@@ -0,0 +1,156 @@
+import os
+import json
+import time
+import sqlite3
+from itertools import accumulate, groupby
+
+HISTORY_FILE = 'game_history.db'
+MAX_TURNS = 6
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS games (
+    id INTEGER PRIMARY KEY,
+    target TEXT NOT NULL,
+    won INTEGER NOT NULL,
+    guess_count INTEGER NOT NULL,
+    hints_shown INTEGER NOT NULL,
+    started REAL NOT NULL,
+    finished REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS guesses (
+    game_id INTEGER NOT NULL REFERENCES games(id),
+    turn INTEGER NOT NULL,
+    guess TEXT NOT NULL,
+    hint TEXT NOT NULL,
+    elapsed REAL NOT NULL,
+    PRIMARY KEY (game_id, turn)
+);
+CREATE TABLE IF NOT EXISTS counters (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS games_result ON games (won, guess_count);
+CREATE INDEX IF NOT EXISTS games_finished ON games (finished);
+'''
+
+
+def empty_stats():
+    return {
+        'win_indeces': {str(turn): 0 for turn in range(MAX_TURNS, 0, -1)},
+        'matches_played': 0,
+        'matches_won': 0,
+        'matches_lost': 0,
+    }
+
+
+class Game_History:
+    # Finished games are only ever appended. The counters table is updated in the same
+    # transaction as each insert, so stats() never has to scan the games.
+    def __init__(self, path = HISTORY_FILE, legacy_file = 'data.json'):
+        self.connection = sqlite3.connect(path)
+        self.connection.execute('PRAGMA journal_mode = WAL')
+        self.connection.execute('PRAGMA synchronous = NORMAL')
+        self.connection.executescript(SCHEMA)
+        self.migrate(legacy_file)
+
+    def migrate(self, legacy_file):
+        # one-time import of the aggregate counters the app used to keep in data.json
+        if self.connection.execute("SELECT 1 FROM meta WHERE key = 'migrated'").fetchone():
+            return
+        with self.connection:
+            if legacy_file and os.path.exists(legacy_file):
+                with open(legacy_file) as fp:
+                    legacy = json.load(fp)
+                counters = {f'win_{turn}': count for turn, count in legacy.get('win_indeces', {}).items()}
+                for name in ('matches_played', 'matches_won', 'matches_lost'):
+                    counters[name] = legacy.get(name, 0)
+                for name, value in counters.items():
+                    self.add_counter(name, value)
+            self.connection.execute("INSERT INTO meta (key, value) VALUES ('migrated', ?)", (legacy_file or '',))
+
+    def add_counter(self, name, amount = 1):
+        self.connection.execute('INSERT INTO counters (name, value) VALUES (?, ?) ON CONFLICT (name) DO UPDATE SET value = value + excluded.value', (name, amount))
+
+    def record_game(self, target, guesses, won, hints_shown = False, started = None, finished = None):
+        # guesses: (guess, hint, seconds since the game started) for every turn
+        finished = finished if finished is not None else time.time()
+        started = started if started is not None else finished
+        with self.connection:
+            cursor = self.connection.execute(
+                'INSERT INTO games (target, won, guess_count, hints_shown, started, finished) VALUES (?, ?, ?, ?, ?, ?)',
+                (target.lower(), int(won), len(guesses), int(hints_shown), started, finished))
+            self.connection.executemany(
+                'INSERT INTO guesses (game_id, turn, guess, hint, elapsed) VALUES (?, ?, ?, ?, ?)',
+                [(cursor.lastrowid, turn, guess.lower(), hint, elapsed) for turn, (guess, hint, elapsed) in enumerate(guesses, start = 1)])
+
+            self.add_counter('matches_played')
+            if won:
+                self.add_counter('matches_won')
+                self.add_counter(f'win_{len(guesses)}')
+            else:
+                self.add_counter('matches_lost')
+
+        return cursor.lastrowid
+
+    def stats(self):
+        # same shape as the old data.json, so Stats_Frame reads it unchanged
+        stats = empty_stats()
+        for name, value in self.connection.execute('SELECT name, value FROM counters'):
+            if name.startswith('win_'):
+                stats['win_indeces'][name[4:]] = value
+            elif name in stats:
+                stats[name] = value
+
+        return stats
+
+    def history_series(self, points = 100):
+        # cumulative win rate (%) and average guesses per game, sampled at no more than
+        # `points` places; games are grouped by id so the work stays in SQLite. Games
+        # imported from data.json only exist as counters: they open the series as one
+        # point (a lost one counted as MAX_TURNS guesses), so it ends on the counters
+        count, won, win_guesses = self.connection.execute('SELECT COUNT(*), COALESCE(SUM(won), 0), COALESCE(SUM(CASE WHEN won THEN guess_count ELSE 0 END), 0) FROM games').fetchone()
+        stats = self.stats()
+        legacy_played = stats['matches_played'] - count
+        legacy_won = stats['matches_won'] - won
+        legacy_guesses = sum(int(turn) * wins for turn, wins in stats['win_indeces'].items()) - win_guesses + (legacy_played - legacy_won) * MAX_TURNS
+        rows = [(legacy_played, legacy_won, legacy_guesses)] if legacy_played > 0 else []
+        if count:
+            bucket = -(-count // points)
+            rows += self.connection.execute(
+                'SELECT COUNT(*), SUM(won), SUM(guess_count) FROM games GROUP BY (id - 1) / ? ORDER BY (id - 1) / ?',
+                (bucket, bucket)).fetchall()
+        if not rows:
+            return [], [], []
+
+        played = list(accumulate(row[0] for row in rows))
+        won = list(accumulate(row[1] for row in rows))
+        guesses = list(accumulate(row[2] for row in rows))
+        win_rate = [100 * wins / games for wins, games in zip(won, played)]
+        average_guesses = [total / games for total, games in zip(guesses, played)]
+
+        return played, win_rate, average_guesses
+
+    def games(self, limit = None):
+        # most recent first, with their guesses
+        query = 'SELECT id, target, won, guess_count, hints_shown, started, finished FROM games ORDER BY id DESC'
+        rows = self.connection.execute(query + (' LIMIT ?' if limit else ''), (limit,) if limit else ()).fetchall()
+        games = []
+        for game_id, target, won, guess_count, hints_shown, started, finished in rows:
+            guesses = self.connection.execute('SELECT guess, hint, elapsed FROM guesses WHERE game_id = ? ORDER BY turn', (game_id,)).fetchall()
+            games.append({'id': game_id, 'target': target, 'won': bool(won), 'guess_count': guess_count, 'hints_shown': bool(hints_shown), 'started': started, 'finished': finished, 'guesses': guesses})
+
+        return games
+
+    def iter_games(self):
+        # oldest first, one game at a time off a single cursor, so replaying a large
+        # history never loads it whole
+        rows = self.connection.execute('SELECT games.id, games.target, guesses.guess FROM games JOIN guesses ON guesses.game_id = games.id ORDER BY games.id, guesses.turn')
+        for (game_id, target), group in groupby(rows, key = lambda row: row[:2]):
+            yield game_id, target, [row[2] for row in group]
+
+    def close(self):
+        self.connection.close()
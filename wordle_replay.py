@@ -0,0 +1,258 @@
+import os
+import re
+import csv
+import sys
+import heapq
+import argparse
+import numpy as np
+from collections import Counter
+from itertools import islice
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from wordle_engine import Pattern_Engine, METRICS, WORD_LENGTH, CACHE_DIR, hint_to_pattern
+from wordle_history import Game_History, HISTORY_FILE
+import wordle_solver
+from wordle_solver import init_worker, MAX_GUESSES
+
+CHUNK_SIZE = 32
+WORST_STEPS = 10
+SKIP_EXAMPLES = 5
+# shared grids: green and yellow, plus their high-contrast colors, and both blanks
+EMOJI_HINTS = {'\U0001F7E9': 'X', '\U0001F7E7': 'X', '\U0001F7E8': 'O', '\U0001F7E6': 'O', '⬛': '-', '⬜': '-'}
+SHARE_HEADER = re.compile(r'^\s*wordle\b.*\b[\dx]/\d', re.IGNORECASE)
+STEP_FIELDS = ('source', 'target', 'turn', 'guess', 'inferred', 'hint', 'before', 'after', 'score', 'best_guess', 'best_score', 'lost')
+
+
+# Input: games are read lazily and sent to the workers as (source, target, guesses, hints),
+# with guesses None for an emoji grid and hints None for a guess list
+def read_games(lines, name):
+    # one game per line, the target first: 'crane: roate grace crane'; or the target alone
+    # on a line, followed by a shared emoji grid (its 'Wordle 1,234 4/6' header is skipped)
+    target, hints, start = None, [], 0
+    for number, line in enumerate(lines, start = 1):
+        line = line.strip()
+        squares = line.replace(' ', '')
+        if squares and all(symbol in EMOJI_HINTS for symbol in squares):
+            hints.append(''.join(EMOJI_HINTS[symbol] for symbol in squares))
+            continue
+        if hints:
+            yield f'{name}:{start}', target, None, hints
+            target, hints = None, []
+        if not line or SHARE_HEADER.match(line):
+            continue
+        words = re.findall(r'[a-z]+', line.lower())
+        if len(words) == 1:
+            target, start = words[0], number
+        elif words:
+            yield f'{name}:{number}', words[0], words[1:], None
+    if hints:
+        yield f'{name}:{start}', target, None, hints
+
+
+def read_history(path = HISTORY_FILE):
+    if not os.path.exists(path):
+        raise FileNotFoundError(f'no game history at {path}')
+    history = Game_History(path)
+    try:
+        for game_id, target, guesses in history.iter_games():
+            yield f'{path}#{game_id}', target, guesses, None
+    finally:
+        history.close()
+
+
+# Analysis: each step is scored against the bot's best guess for the same position
+def infer_guess(engine, candidates, target, hint, metric):
+    # an emoji row hides its guess: the row is scored as the mean over every allowed guess
+    # that gives this hint against the target, and the game carries on with the guess whose
+    # remaining candidate count is the median of theirs
+    pattern = hint_to_pattern(hint)
+    guesses = np.flatnonzero(engine.pattern_block(slice(None), [engine.target_index[target]])[:, 0] == pattern)
+    if len(guesses) == 0:
+        return None, None
+    scores = engine.score_guesses(candidates, metric, guesses)
+    remaining = np.empty(len(guesses), dtype = int)
+    chunk_size = max(1, engine.chunk_cells // len(candidates))
+    for start in range(0, len(guesses), chunk_size):
+        rows = guesses[start:start + chunk_size]
+        remaining[start:start + len(rows)] = np.count_nonzero(engine.pattern_block(rows, candidates) == pattern, axis = 1)
+    median = np.argsort(remaining, kind = 'stable')[len(guesses) // 2]
+
+    return engine.long_word_list[guesses[median]], float(scores.mean())
+
+
+def analyze_game(solver, game):
+    source, target, guesses, hints = game
+    engine = solver.engine
+    if target is None:
+        return {'source': source, 'error': 'no target given for the grid'}
+    if target not in engine.target_index:
+        return {'source': source, 'error': f'{target!r} is not a possible answer'}
+    unknown = [guess for guess in guesses or () if guess not in engine.guess_index]
+    if unknown:
+        return {'source': source, 'error': f'{unknown[0]!r} is not an allowed guess'}
+    wrong = [hint for hint in hints or () if len(hint) != engine.word_length]
+    if wrong:
+        return {'source': source, 'error': f'grid row of {len(wrong[0])} squares for {engine.word_length} letters'}
+
+    solver.restart()
+    steps = []
+    for turn, move in enumerate(guesses if hints is None else hints, start = 1):
+        candidates = solver.candidates
+        inferred = hints is not None and move != engine.win_hint
+        if hints is None:
+            guess, hint = move, engine.generate_hint(move, target)
+        else:
+            guess, hint = target if move == engine.win_hint else None, move
+        if inferred:
+            guess, score = infer_guess(engine, candidates, target, hint, solver.metric)
+            if guess is None:
+                return {'source': source, 'error': f'grid row {turn} ({hint}) fits no allowed guess against {target!r}'}
+        else:
+            score = float(engine.score_guesses(candidates, solver.metric, np.array([engine.guess_index[guess]]))[0])
+
+        # one candidate left scores 0 whatever is guessed, so the answer is the best guess
+        if len(candidates) == 1:
+            best_guess, best_score = engine.short_word_list[candidates[0]], score
+        else:
+            # a book entry's score is rounded: rescored live, like the chosen guess
+            best_guess = solver.ranking().page(0, 1)[0][0]
+            best_score = float(engine.score_guesses(candidates, solver.metric, np.array([engine.guess_index[best_guess]]))[0])
+        solver.apply(guess, hint)
+        steps.append((turn, guess, inferred, hint, len(candidates), len(solver.candidates), score, best_guess, best_score, max(0.0, best_score - score)))
+        if hint == engine.win_hint:
+            break
+
+    won = steps[-1][3] == engine.win_hint and len(steps) <= MAX_GUESSES
+    return {'source': source, 'target': target, 'won': won, 'emoji': hints is not None, 'steps': steps}
+
+
+def analyze_games(games):
+    return [analyze_game(wordle_solver.worker_solver, game) for game in games]
+
+
+def chunked(games, chunk_size):
+    games = iter(games)
+    while chunk := list(islice(games, chunk_size)):
+        yield chunk
+
+
+def analyze_stream(games, engine, metric = 'entropy', processes = None, chunk_size = CHUNK_SIZE, book_dir = CACHE_DIR):
+    # results come back in completion order; at most two chunks per worker are in flight,
+    # so memory stays flat however long the input is
+    processes = processes or os.cpu_count() or 1
+    worker_args = (metric, engine.short_file, engine.long_file, engine.cache_dir, book_dir)
+    if processes == 1:
+        init_worker(*worker_args)
+        for chunk in chunked(games, chunk_size):
+            yield from analyze_games(chunk)
+        return
+
+    with ProcessPoolExecutor(max_workers = processes, initializer = init_worker, initargs = worker_args) as executor:
+        pending = set()
+        for chunk in chunked(games, chunk_size):
+            pending.add(executor.submit(analyze_games, chunk))
+            if len(pending) >= processes * 2:
+                done, pending = wait(pending, return_when = FIRST_COMPLETED)
+                for future in done:
+                    yield from future.result()
+        while pending:
+            done, pending = wait(pending, return_when = FIRST_COMPLETED)
+            for future in done:
+                yield from future.result()
+
+
+class Replay_Report:
+    # Running totals per turn, so the report never keeps the games themselves;
+    # `lost` is the best guess's score minus the chosen one's (bits with entropy)
+    def __init__(self, metric = 'entropy', worst = WORST_STEPS):
+        self.metric = metric
+        self.worst = worst
+        self.games = 0
+        self.won = 0
+        self.emoji = 0
+        self.guess_counts = Counter()
+        self.skipped = 0
+        self.skip_examples = []
+        self.turns = {}
+        self.largest_losses = []
+
+    def add(self, result):
+        if 'error' in result:
+            self.skipped += 1
+            if len(self.skip_examples) < SKIP_EXAMPLES:
+                self.skip_examples.append(f"{result['source']}: {result['error']}")
+            return
+        self.games += 1
+        self.won += result['won']
+        self.emoji += result['emoji']
+        if result['won']:
+            self.guess_counts[len(result['steps'])] += 1
+        for turn, guess, inferred, hint, before, after, score, best_guess, best_score, lost in result['steps']:
+            # games, candidates before, after, bits gained, chosen score, best score, lost, best moves
+            totals = self.turns.setdefault(turn, np.zeros(8))
+            totals += (1, before, after, np.log2(before / after), score, best_score, lost, lost <= 1e-9)
+            entry = (lost, result['source'], turn, guess, score, best_guess, best_score)
+            if len(self.largest_losses) < self.worst:
+                heapq.heappush(self.largest_losses, entry)
+            elif lost > self.largest_losses[0][0]:
+                heapq.heapreplace(self.largest_losses, entry)
+
+    def print(self):
+        print(f'Games analyzed: {self.games} ({self.emoji} from emoji grids, rows scored over every guess that fits), {self.skipped} skipped')
+        if self.games:
+            mean = sum(turns * count for turns, count in self.guess_counts.items()) / max(1, self.won)
+            print(f'Won: {self.won} ({self.won / self.games:.1%}), mean guesses when won {mean:.3f}')
+            print(f"{'turn':>4}{'games':>8}{'before':>9}{'after':>8}{'bits':>7}{'chosen':>9}{'best':>9}{'lost':>8}{'best %':>8}")
+            for turn in sorted(self.turns):
+                count, before, after, bits, score, best, lost, best_moves = self.turns[turn]
+                print(f'{turn:>4}{int(count):>8}{before / count:9.1f}{after / count:8.1f}{bits / count:7.2f}{score / count:9.4f}{best / count:9.4f}{lost / count:8.4f}{best_moves / count:8.1%}')
+            print(f"Mean {self.metric} lost per game: {sum(totals[6] for totals in self.turns.values()) / self.games:.4f}")
+        if self.largest_losses:
+            print('Largest losses:')
+            for lost, source, turn, guess, score, best_guess, best_score in sorted(self.largest_losses, reverse = True):
+                print(f'  {source} turn {turn}: {guess.upper()} {score:.4f} vs {best_guess.upper()} {best_score:.4f} (-{lost:.4f})')
+        for example in self.skip_examples:
+            print(f'Skipped {example}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description = 'Replay recorded Wordle games and compare every guess with the bot\'s best.')
+    parser.add_argument('files', nargs = '*', help = "games to replay, '-' for stdin: 'target guess guess ...' per line, or a target line followed by a shared emoji grid")
+    parser.add_argument('--history', nargs = '?', const = HISTORY_FILE, default = None, metavar = 'DB', help = f'also replay the games recorded by the app (default {HISTORY_FILE})')
+    parser.add_argument('--metric', choices = METRICS, default = 'entropy', help = 'score to compare guesses with (entropy reports the loss in bits)')
+    parser.add_argument('--processes', type = int, default = None, help = 'worker processes (default: all cores)')
+    parser.add_argument('--chunk-size', type = int, default = CHUNK_SIZE, help = 'games sent to a worker at a time')
+    parser.add_argument('--steps', default = None, metavar = 'CSV', help = 'also write every analyzed step to this CSV file')
+    parser.add_argument('--length', type = int, default = WORD_LENGTH, help = 'word length; other lengths read possible_words_N.txt and allowed_words_N.txt')
+    args = parser.parse_args()
+    if not args.files and not args.history:
+        parser.error('give game files or --history')
+
+    def games():
+        for file_name in args.files:
+            if file_name == '-':
+                yield from read_games(sys.stdin, 'stdin')
+                continue
+            with open(file_name, encoding = 'utf-8') as fp:
+                yield from read_games(fp, file_name)
+        if args.history:
+            yield from read_history(args.history)
+
+    engine = Pattern_Engine(word_length = args.length, processes = args.processes)
+    report = Replay_Report(args.metric)
+    steps_file = open(args.steps, 'w', newline = '') if args.steps else None
+    try:
+        writer = csv.writer(steps_file) if steps_file else None
+        if writer:
+            writer.writerow(STEP_FIELDS)
+        for result in analyze_stream(games(), engine, args.metric, args.processes, args.chunk_size):
+            report.add(result)
+            if writer and 'steps' in result:
+                writer.writerows((result['source'], result['target'], *step) for step in result['steps'])
+    finally:
+        if steps_file:
+            steps_file.close()
+    report.print()
+
+
+if __name__ == '__main__':
+    main()
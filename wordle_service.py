@@ -0,0 +1,245 @@
+import os
+import json
+import time
+import random
+import asyncio
+import argparse
+import numpy as np
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from wordle_engine import Pattern_Engine, METRICS, HINT_SYMBOLS, WORD_LENGTH
+import wordle_solver
+from wordle_solver import Wordle_Solver, init_worker
+
+HOST = '127.0.0.1'
+PORT = 8052
+RANK_LIMIT = 20
+LATENCY_SAMPLES = 10000
+RATE_WINDOW = 10
+STATUS_TEXT = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed'}
+
+
+# Workers: one solver per process on the mmap-cached matrix, so every worker maps the
+# same read-only pages instead of holding its own copy
+def rank_position(history, metric, limit):
+    solver = wordle_solver.worker_solver
+    solver.restart()
+    solver.metric = metric
+    for guess, hint in history:
+        solver.apply(guess, hint)
+    # contradictory hints leave nothing to rank
+    if len(solver.candidates) == 0:
+        return 0, []
+    ranking = solver.rank(limit)
+
+    return len(solver.candidates), [[word, round(float(score), 6)] for word, score in ranking.items()]
+
+
+class Hint_Service:
+    # Requests for a position that is already being scored wait on the same future
+    # instead of queueing a second copy of the work.
+    def __init__(self, engine, processes = None):
+        self.engine = engine
+        self.processes = processes or os.cpu_count() or 1
+        self.executor = ProcessPoolExecutor(max_workers = self.processes, initializer = init_worker, initargs = ('expected_info', engine.short_file, engine.long_file, engine.cache_dir))
+        self.in_flight = {}
+        self.latencies = deque(maxlen = LATENCY_SAMPLES)
+        # finish times of the requests in the last RATE_WINDOW seconds
+        self.finished = deque()
+        self.started = time.perf_counter()
+        self.requests = 0
+        self.batched = 0
+        self.errors = 0
+
+    def parse_request(self, request):
+        # {"history": [["roate", "--O-X"], ...], "metric": "entropy", "limit": 20}
+        metric = request.get('metric', 'expected_info')
+        if metric not in METRICS:
+            raise ValueError(f'unknown metric {metric!r}')
+        limit = int(request.get('limit', RANK_LIMIT))
+        history = []
+        for entry in request.get('history', []):
+            guess, hint = str(entry[0]).lower(), str(entry[1]).upper()
+            if guess not in self.engine.guess_index:
+                raise ValueError(f'{guess!r} is not an allowed guess')
+            if len(hint) != self.engine.word_length or any(symbol not in HINT_SYMBOLS for symbol in hint):
+                raise ValueError(f'{hint!r} is not a {self.engine.word_length} letter hint of {HINT_SYMBOLS!r}')
+            history.append((guess, hint))
+
+        return tuple(history), metric, max(1, limit)
+
+    async def rank(self, request):
+        history, metric, limit = self.parse_request(request)
+        key = (history, metric, limit)
+        future = self.in_flight.get(key)
+        if future is None:
+            future = asyncio.get_running_loop().run_in_executor(self.executor, rank_position, history, metric, limit)
+            self.in_flight[key] = future
+            future.add_done_callback(lambda _: self.in_flight.pop(key, None))
+        else:
+            self.batched += 1
+        remaining, ranking = await asyncio.shield(future)
+        if remaining == 0:
+            raise ValueError('no word fits this history')
+
+        return {'remaining': remaining, 'ranking': ranking}
+
+    def record(self, start_time):
+        now = time.perf_counter()
+        self.requests += 1
+        self.latencies.append(now - start_time)
+        self.finished.append(now)
+        self.drop_finished(now)
+
+    def drop_finished(self, now):
+        while self.finished and self.finished[0] < now - RATE_WINDOW:
+            self.finished.popleft()
+
+    def stats(self):
+        # the rate covers the last RATE_WINDOW seconds, so idle time before a burst
+        # does not dilute it
+        latencies = np.array(self.latencies) * 1000 if self.latencies else np.zeros(1)
+        now = time.perf_counter()
+        self.drop_finished(now)
+        window = min(RATE_WINDOW, now - self.started)
+        return {
+            'requests': self.requests,
+            'batched': self.batched,
+            'errors': self.errors,
+            'requests_per_second': len(self.finished) / window if window else 0,
+            'p50_ms': float(np.percentile(latencies, 50)),
+            'p99_ms': float(np.percentile(latencies, 99)),
+            'workers': self.processes,
+        }
+
+    async def dispatch(self, method, path, body):
+        match path:
+            case '/rank':
+                if method != 'POST':
+                    return 405, {'error': 'POST a JSON position to /rank'}
+                try:
+                    return 200, await self.rank(json.loads(body or b'{}'))
+                except (ValueError, TypeError, IndexError, KeyError, AttributeError) as error:
+                    self.errors += 1
+                    return 400, {'error': str(error)}
+            case '/stats':
+                return 200, self.stats()
+            case _:
+                return 404, {'error': f'no such path {path}'}
+
+    async def handle_connection(self, reader, writer):
+        # minimal HTTP/1.1 with keep-alive: one JSON request and response at a time
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, _ = request_line.decode('latin-1').split(' ', 2)
+                headers = {}
+                while (line := await reader.readline()) not in (b'\r\n', b'\n', b''):
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get('content-length', 0)))
+
+                start_time = time.perf_counter()
+                status, payload = await self.dispatch(method, path, body)
+                if path == '/rank':
+                    self.record(start_time)
+
+                data = json.dumps(payload, separators = (',', ':')).encode()
+                writer.write(f'HTTP/1.1 {status} {STATUS_TEXT[status]}\r\nContent-Type: application/json\r\nContent-Length: {len(data)}\r\n\r\n'.encode() + data)
+                await writer.drain()
+                if headers.get('connection', '').lower() == 'close':
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host = HOST, port = PORT, report_every = 10):
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        print(f'Serving hints on http://{host}:{port}/rank with {self.processes} workers')
+        async with server:
+            while True:
+                await asyncio.sleep(report_every)
+                if self.requests:
+                    print_stats(self.stats())
+
+    def close(self):
+        self.executor.shutdown(cancel_futures = True)
+
+
+def print_stats(stats):
+    print(f"{stats['requests']} requests ({stats['batched']} batched, {stats['errors']} errors), {stats['requests_per_second']:.1f} req/s, p50 {stats['p50_ms']:.1f} ms, p99 {stats['p99_ms']:.1f} ms")
+
+
+def sample_positions(engine, count, seed = 0):
+    # histories the bot itself reaches, so the load looks like real games
+    random.seed(seed)
+    solver = Wordle_Solver(engine)
+    positions = []
+    while len(positions) < count:
+        target = random.choice(engine.short_word_list)
+        guesses = solver.play(target)
+        turns = random.randrange(len(guesses))
+        positions.append([[guess, engine.generate_hint(guess, target)] for guess in guesses[:turns]])
+
+    return positions
+
+
+async def run_client(host, port, positions, latencies):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for history in positions:
+            body = json.dumps({'history': history}).encode()
+            start_time = time.perf_counter()
+            writer.write(f'POST /rank HTTP/1.1\r\nHost: {host}\r\nContent-Length: {len(body)}\r\n\r\n'.encode() + body)
+            await writer.drain()
+            headers = {}
+            await reader.readline()
+            while (line := await reader.readline()) not in (b'\r\n', b''):
+                name, _, value = line.decode('latin-1').partition(':')
+                headers[name.strip().lower()] = value.strip()
+            await reader.readexactly(int(headers['content-length']))
+            latencies.append(time.perf_counter() - start_time)
+    finally:
+        writer.close()
+
+
+async def run_load(host, port, positions, clients):
+    # every client keeps one connection open and sends its share of positions back to back
+    latencies = []
+    start_time = time.perf_counter()
+    await asyncio.gather(*(run_client(host, port, positions[index::clients], latencies) for index in range(clients)))
+    elapsed = time.perf_counter() - start_time
+
+    latencies = np.array(latencies) * 1000
+    print(f'{len(latencies)} requests from {clients} clients in {elapsed:.2f}s: {len(latencies) / elapsed:.1f} req/s, p50 {np.percentile(latencies, 50):.1f} ms, p99 {np.percentile(latencies, 99):.1f} ms')
+
+
+def main():
+    parser = argparse.ArgumentParser(description = 'Serve ranked Wordle guesses over local HTTP, or load-test a running service.')
+    parser.add_argument('--host', default = HOST)
+    parser.add_argument('--port', type = int, default = PORT)
+    parser.add_argument('--processes', type = int, default = None, help = 'worker processes (default: all cores)')
+    parser.add_argument('--length', type = int, default = WORD_LENGTH, help = 'word length; other lengths read possible_words_N.txt and allowed_words_N.txt')
+    parser.add_argument('--bench', type = int, default = None, metavar = 'N', help = 'send N requests to a running service instead of serving')
+    parser.add_argument('--clients', type = int, default = 32, help = 'concurrent connections for --bench')
+    args = parser.parse_args()
+
+    engine = Pattern_Engine(word_length = args.length)
+    if args.bench:
+        asyncio.run(run_load(args.host, args.port, sample_positions(engine, args.bench), args.clients))
+        return
+
+    service = Hint_Service(engine, args.processes)
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        print_stats(service.stats())
+    finally:
+        service.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,423 @@
+import os
+import time
+import argparse
+import multiprocessing
+import numpy as np
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, wait
+from wordle_engine import Pattern_Engine, Guess_Ranking, Prefix_Index, Ranking_Cache, RANKING_CACHE_SIZE, METRICS, ADVERSARY_RULES, WORD_LENGTH, CACHE_DIR, hint_to_pattern, pattern_to_hint, score_block, word_list_files, fingerprint
+from wordle_book import Opening_Book
+
+MAX_GUESSES = 6
+LOOKAHEAD_BEAM = 8
+LOOKAHEAD_BUDGET = 1.5
+
+
+class Wordle_Solver:
+    def __init__(self, engine = None, metric = 'expected_info', book_dir = CACHE_DIR, hard_mode = False, cache_size = RANKING_CACHE_SIZE):
+        self.engine = engine if engine is not None else Pattern_Engine()
+        self.metric = metric
+        self.hard_mode = hard_mode
+        self.book_dir = book_dir
+        self.books = {}
+        self.opening_rank = {}
+        self.cache = Ranking_Cache(cache_size)
+        self.executor = None
+        self.consistent = None
+        self.restart()
+
+    def restart(self):
+        # nothing is copied: the full candidate set is the engine's shared index array
+        self.candidates = self.engine.all_targets
+        self.legal = self.engine.all_guesses
+        self.history = []
+        self.candidate_stack = []
+
+    def apply(self, guess, hint):
+        # one pattern-matrix row narrows the current index array; the hard-mode legal
+        # guesses are narrowed the same way, whether or not hard mode is on
+        guess_index = self.engine.guess_index[guess.lower()]
+        pattern = hint_to_pattern(hint)
+        self.candidate_stack.append((self.candidates, self.legal))
+        self.candidates = self.engine.filter_pattern(self.candidates, guess_index, pattern)
+        self.legal = self.engine.legal_guesses(self.legal, guess_index, pattern)
+        self.history.append((guess.lower(), hint))
+
+    def undo(self):
+        if not self.history:
+            return None
+        self.candidates, self.legal = self.candidate_stack.pop()
+
+        return self.history.pop()
+
+    def set_position(self, candidates, history, legal = None):
+        # without hard mode the legal guesses are not looked at, so they are only
+        # rebuilt from the history when hard mode is on and none were passed
+        self.candidates = candidates
+        self.history = list(history)
+        self.candidate_stack = []
+        if legal is None:
+            legal = self.engine.all_guesses
+            if self.hard_mode:
+                for guess, hint in self.history:
+                    legal = self.engine.legal_guesses(legal, self.engine.guess_index[guess], hint_to_pattern(hint))
+        self.legal = legal
+
+    def is_legal(self, word):
+        # hard mode only: the guess keeps every green and uses every yellow seen so far
+        if not self.hard_mode:
+            return True
+        guess_index = self.engine.guess_index[word.lower()]
+        position = np.searchsorted(self.legal, guess_index)
+
+        return position < len(self.legal) and self.legal[position] == guess_index
+
+    def remaining_words(self):
+        return self.engine.candidate_words(self.candidates)
+
+    def adversary_bucket(self, guess, rule = 'largest'):
+        # the candidates an adversary keeps after `guess`, as words
+        guess_index = self.engine.guess_index[guess.lower()]
+        pattern = self.engine.adversary_pattern(self.candidates, guess_index, rule)
+
+        return self.engine.candidate_words(self.engine.filter_pattern(self.candidates, guess_index, pattern))
+
+    def consistent_words(self):
+        # Prefix_Index of the allowed words that fit every hint so far, rebuilt when the history changes
+        history = tuple(self.history)
+        if self.consistent is None or self.consistent[0] != history:
+            self.consistent = (history, Prefix_Index(self.engine.consistent_guesses(history)))
+
+        return self.consistent[1]
+
+    def opening_book(self):
+        if self.book_dir is None:
+            return None
+        if self.metric not in self.books:
+            self.books[self.metric] = Opening_Book.load(self.engine, self.metric, self.book_dir)
+
+        return self.books[self.metric]
+
+    def ranking(self, book = True):
+        # a Guess_Ranking; book entries only hold the top few guesses, book = False
+        # scores every allowed guess
+        if len(self.candidates) == 1:
+            return Guess_Ranking.from_dict({self.engine.short_word_list[self.candidates[0]]: 1})
+
+        # precomputed early positions first, live scoring only outside the book;
+        # hard mode leaves the book after the opening, its guesses may be illegal
+        hard_mode = self.hard_mode and bool(self.history)
+        opening_book = self.opening_book() if book and not hard_mode else None
+        if opening_book is not None:
+            ranking = opening_book.lookup(self.history)
+            if ranking is not None:
+                return Guess_Ranking.from_dict(ranking)
+
+        # the opening position never changes, so rank it once per metric
+        if not self.history:
+            if self.metric not in self.opening_rank:
+                self.opening_rank[self.metric] = self.engine.ranking(self.candidates, metric = self.metric)
+            return self.opening_rank[self.metric]
+
+        # other positions go through the LRU cache; in hard mode the legal guesses are part
+        # of the position too
+        guesses = self.legal if hard_mode else None
+        key = (self.metric, fingerprint(self.candidates), None if guesses is None else fingerprint(guesses))
+        return self.cache.get(key, lambda: self.engine.ranking(self.candidates, metric = self.metric, guesses = guesses))
+
+    def rank(self, limit = None):
+        return self.ranking().top(limit)
+
+    def best_guess(self):
+        return next(iter(self.rank(limit = 1)))
+
+    def rank_lookahead(self, ranking = None, beam = LOOKAHEAD_BEAM, budget = LOOKAHEAD_BUDGET, processes = None, cancelled = None):
+        # two-ply scores for the top `beam` greedy guesses; guesses that miss the
+        # wall-clock budget are left out rather than holding up the caller. The deadline is
+        # time.time(), the worker processes check it between buckets too
+        cancelled = cancelled or (lambda: False)
+        if len(self.candidates) <= 2:
+            return {}
+        ranking = ranking if ranking is not None else self.ranking()
+        beam_words = list(ranking.top(beam))
+        guesses = [self.engine.guess_index[word] for word in beam_words]
+        deadline = time.time() + budget
+        # in hard mode the follow-ups must be legal too
+        legal = self.legal if self.hard_mode else None
+        processes = processes or os.cpu_count() or 1
+
+        lookahead = {}
+        if processes == 1:
+            for word, guess in zip(beam_words, guesses):
+                if time.time() > deadline or cancelled():
+                    break
+                score = lookahead_score(self.engine, guess, self.candidates, self.metric, deadline, legal)
+                if score is not None:
+                    lookahead[word] = score
+            return lookahead
+
+        # spawned, not forked: the caller may be the app's hint worker thread, and a fork
+        # there copies the other threads' locks; no more workers than guesses to score
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(max_workers = min(processes, beam), mp_context = multiprocessing.get_context('spawn'), initializer = init_worker, initargs = (self.metric, self.engine.short_file, self.engine.long_file, self.engine.cache_dir))
+        futures = {self.executor.submit(worker_lookahead_score, guess, self.candidates, self.metric, deadline, legal): word for word, guess in zip(beam_words, guesses)}
+        not_done = set(futures)
+        while not_done and not cancelled() and time.time() < deadline:
+            _, not_done = wait(not_done, timeout = min(0.05, max(0, deadline - time.time())))
+        for future in not_done:
+            future.cancel()
+        for future in futures:
+            if future.done() and not future.cancelled() and future.result() is not None:
+                lookahead[futures[future]] = future.result()
+
+        return {word: lookahead[word] for word in beam_words if word in lookahead}
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait = False, cancel_futures = True)
+            self.executor = None
+
+    def play(self, target, max_turns = 20):
+        # keeps guessing past MAX_GUESSES so failures still report how long they took
+        self.restart()
+        guesses = []
+        target_index = self.engine.target_index[target]
+        while len(guesses) < max_turns:
+            guess = self.best_guess()
+            pattern = int(self.engine.pattern_row(guess)[target_index])
+            guesses.append(guess)
+            if pattern == self.engine.win_pattern:
+                break
+            self.apply(guess, pattern_to_hint(pattern, self.engine.word_length))
+
+        return guesses
+
+    def play_adversary(self, rule = 'largest', max_turns = 20):
+        # no fixed target: every hint comes from the bucket the adversary keeps
+        self.restart()
+        guesses = []
+        while len(guesses) < max_turns:
+            guess = self.best_guess()
+            bucket = self.adversary_bucket(guess, rule)
+            hint = self.engine.generate_hint(guess, bucket[0])
+            guesses.append((guess, hint))
+            if hint == self.engine.win_hint:
+                break
+            self.apply(guess, hint)
+
+        return guesses
+
+
+class Multi_Board_Solver:
+    # Several targets share every guess (Quordle/Octordle). Each board keeps its own
+    # candidate array; a solved board is frozen and left out of the joint scoring.
+    def __init__(self, engine = None, boards = 4, metric = 'expected_info', cache_size = RANKING_CACHE_SIZE):
+        self.engine = engine if engine is not None else Pattern_Engine()
+        self.boards = boards
+        self.max_guesses = boards + MAX_GUESSES - 1
+        self.metric = metric
+        self.opening_rank = {}
+        self.cache = Ranking_Cache(cache_size)
+        self.restart()
+
+    def restart(self):
+        self.candidates = [self.engine.all_targets] * self.boards
+        self.solved = [False] * self.boards
+        self.history = []
+        self.stack = []
+
+    def apply(self, guess, hints):
+        # hints holds one hint per board, None for boards solved earlier
+        self.stack.append((self.candidates, self.solved))
+        self.candidates = [candidates if hint is None else self.engine.filter_candidates(candidates, guess, hint) for candidates, hint in zip(self.candidates, hints)]
+        self.solved = [solved or hint == self.engine.win_hint for solved, hint in zip(self.solved, hints)]
+        self.history.append((guess.lower(), tuple(hints)))
+
+    def undo(self):
+        if not self.history:
+            return None
+        self.candidates, self.solved = self.stack.pop()
+
+        return self.history.pop()
+
+    def open_boards(self):
+        return [board for board in range(self.boards) if not self.solved[board]]
+
+    def ranking(self):
+        # every board starts from the same candidates, so the opening is ranked once per metric
+        if not self.history:
+            if self.metric not in self.opening_rank:
+                self.opening_rank[self.metric] = self.engine.board_ranking(self.candidates, metric = self.metric)
+            return self.opening_rank[self.metric]
+
+        candidate_sets = [self.candidates[board] for board in self.open_boards()]
+        return self.cache.get(board_key(self.metric, candidate_sets), lambda: self.engine.board_ranking(candidate_sets, metric = self.metric))
+
+    def best_guess(self):
+        return next(iter(self.ranking().top(1)))
+
+    def play(self, targets, max_turns = 40):
+        self.restart()
+        guesses = []
+        while len(guesses) < max_turns and not all(self.solved):
+            guess = self.best_guess()
+            guesses.append(guess)
+            self.apply(guess, [None if solved else self.engine.generate_hint(guess, target) for solved, target in zip(self.solved, targets)])
+
+        return guesses
+
+
+def board_key(metric, candidate_sets):
+    # the joint score does not depend on the order of the boards
+    return ('boards', metric, *sorted(fingerprint(candidates) for candidates in candidate_sets))
+
+
+def run_boards_benchmark(engine, boards, games, metric = 'expected_info', seed = 0):
+    # random target tuples; reports guesses per game and how long each hint took
+    rng = np.random.default_rng(seed)
+    solver = Multi_Board_Solver(engine, boards, metric)
+    guess_counts = []
+    hint_seconds = []
+    for _ in range(games):
+        targets = [engine.short_word_list[index] for index in rng.choice(len(engine.short_word_list), boards, replace = False)]
+        solver.restart()
+        while not all(solver.solved) and len(solver.history) < 40:
+            start_time = time.perf_counter()
+            guess = solver.best_guess()
+            hint_seconds.append(time.perf_counter() - start_time)
+            solver.apply(guess, [None if solved else engine.generate_hint(guess, target) for solved, target in zip(solver.solved, targets)])
+        guess_counts.append(len(solver.history))
+
+    return {
+        'games': games,
+        'distribution': dict(sorted(Counter(guess_counts).items())),
+        'mean_guesses': float(np.mean(guess_counts)),
+        'failures': sum(count > solver.max_guesses for count in guess_counts),
+        'hint_ms_mean': float(np.mean(hint_seconds)) * 1000,
+        'hint_ms_p99': float(np.percentile(hint_seconds, 99)) * 1000,
+    }
+
+
+def lookahead_score(engine, guess, candidates, metric = 'expected_info', deadline = None, legal = None):
+    # greedy score of the guess plus the expected score of the best follow-up
+    # guess inside each pattern bucket it leaves behind; None once time.time()
+    # passes the deadline, a guess with many large buckets can take seconds.
+    # legal: the hard-mode legal guesses, narrowed by each bucket's pattern
+    patterns = engine.pattern_block([guess], candidates)[0]
+    score = score_block(patterns[None, :], metric)[0]
+
+    order = np.argsort(patterns, kind = 'stable')
+    ordered = patterns[order]
+    bounds = np.flatnonzero(np.diff(ordered)) + 1
+    for bucket, pattern in zip(np.split(candidates[order], bounds), ordered[np.append(0, bounds)]):
+        if pattern == engine.win_pattern or len(bucket) == 1:
+            continue
+        if deadline is not None and time.time() > deadline:
+            return None
+        guesses = None if legal is None else engine.legal_guesses(legal, guess, pattern)
+        score += len(bucket) / len(candidates) * engine.score_guesses(bucket, metric, guesses).max()
+
+    return float(score)
+
+
+# Workers: one solver per process, the matrix is shared through the mmap cache. The
+# parent loads a Pattern_Engine first, which builds (or refreshes) that cache, so the
+# workers only map it instead of each building their own
+worker_solver = None
+
+
+def init_worker(metric, short_file = None, long_file = None, cache_dir = CACHE_DIR, book_dir = CACHE_DIR, hard_mode = False):
+    global worker_solver
+    worker_solver = Wordle_Solver(Pattern_Engine(short_file, long_file, cache_dir = cache_dir), metric = metric, book_dir = book_dir, hard_mode = hard_mode)
+
+
+def play_targets(targets):
+    return [len(worker_solver.play(target)) for target in targets]
+
+
+def worker_lookahead_score(guess, candidates, metric, deadline = None, legal = None):
+    return lookahead_score(worker_solver.engine, guess, candidates, metric, deadline, legal)
+
+
+def run_benchmark(targets, metric = 'expected_info', processes = None, chunk_size = 16, short_file = None, long_file = None, book_dir = CACHE_DIR, memory_cap = None, hard_mode = False):
+    processes = processes or os.cpu_count() or 1
+    chunks = [targets[start:start + chunk_size] for start in range(0, len(targets), chunk_size)]
+
+    engine = Pattern_Engine(short_file, long_file, processes = processes, memory_cap = memory_cap)
+    worker_args = (metric, engine.short_file, engine.long_file, engine.cache_dir, book_dir, hard_mode)
+    start_time = time.perf_counter()
+    if processes == 1:
+        init_worker(*worker_args)
+        results = [play_targets(chunk) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers = processes, initializer = init_worker, initargs = worker_args) as executor:
+            results = list(executor.map(play_targets, chunks))
+    elapsed = time.perf_counter() - start_time
+
+    guess_counts = [count for chunk in results for count in chunk]
+    return {
+        'games': len(guess_counts),
+        'distribution': dict(sorted(Counter(guess_counts).items())),
+        'mean_guesses': float(np.mean(guess_counts)),
+        'failures': sum(count > MAX_GUESSES for count in guess_counts),
+        'seconds': elapsed,
+        'games_per_second': len(guess_counts) / elapsed,
+    }
+
+
+def print_report(report):
+    print(f"Games played:   {report['games']}")
+    print(f"Mean guesses:   {report['mean_guesses']:.4f}")
+    print(f"Failures (>{MAX_GUESSES}): {report['failures']}")
+    print(f"Elapsed:        {report['seconds']:.2f}s ({report['games_per_second']:.1f} games/s)")
+    print('Guess distribution:')
+    largest = max(report['distribution'].values())
+    for guesses, games in report['distribution'].items():
+        bar = '#' * max(1, round(40 * games / largest))
+        print(f'  {guesses:>2}: {games:>5} {bar}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description = 'Play the Wordle bot against every possible target without a window.')
+    parser.add_argument('--metric', choices = METRICS, default = 'expected_info')
+    parser.add_argument('--processes', type = int, default = None, help = 'worker processes (default: all cores)')
+    parser.add_argument('--limit', type = int, default = None, help = 'only play the first N targets')
+    parser.add_argument('--target', default = None, help = 'play a single target and print the guesses')
+    parser.add_argument('--boards', type = int, choices = (2, 4, 8), default = None, help = 'play --limit (default 20) multi-board games with this many boards')
+    parser.add_argument('--adversary', choices = ADVERSARY_RULES, default = None, help = 'play one game against an adversary that picks the feedback')
+    parser.add_argument('--length', type = int, default = WORD_LENGTH, help = 'word length; other lengths read possible_words_N.txt and allowed_words_N.txt')
+    parser.add_argument('--possible', default = None, help = 'possible answers word list (overrides --length)')
+    parser.add_argument('--allowed', default = None, help = 'allowed guesses word list (overrides --length)')
+    parser.add_argument('--any-word', action = 'store_true', help = 'every allowed word can be the answer')
+    parser.add_argument('--memory-cap', type = int, default = None, metavar = 'MB', help = 'largest pattern matrix to hold in memory; bigger ones are memory-mapped or streamed')
+    parser.add_argument('--hard', action = 'store_true', help = 'hard mode: every guess keeps the greens and uses the yellows revealed so far')
+    args = parser.parse_args()
+    if args.any_word:
+        args.allowed = args.allowed or word_list_files(args.length)[1]
+        args.possible = args.allowed
+    memory_cap = None if args.memory_cap is None else args.memory_cap << 20
+
+    engine = Pattern_Engine(args.possible, args.allowed, word_length = None if args.possible and args.allowed else args.length, processes = args.processes, memory_cap = memory_cap)
+    if args.target:
+        solver = Wordle_Solver(engine, metric = args.metric, hard_mode = args.hard)
+        for guess in solver.play(args.target.lower()):
+            print(guess.upper(), engine.generate_hint(guess, args.target))
+        return
+    if args.boards:
+        report = run_boards_benchmark(engine, args.boards, args.limit or 20, metric = args.metric)
+        print(f"{report['games']} games on {args.boards} boards: mean {report['mean_guesses']:.2f} guesses, {report['failures']} over {args.boards + MAX_GUESSES - 1}")
+        print(f"Hint time: mean {report['hint_ms_mean']:.1f} ms, p99 {report['hint_ms_p99']:.1f} ms")
+        print('Guess distribution:', report['distribution'])
+        return
+    if args.adversary:
+        solver = Wordle_Solver(engine, metric = args.metric, hard_mode = args.hard)
+        for guess, hint in solver.play_adversary(args.adversary):
+            print(guess.upper(), hint)
+        return
+
+    targets = engine.short_word_list[:args.limit]
+    print_report(run_benchmark(targets, metric = args.metric, processes = args.processes, short_file = engine.short_file, long_file = engine.long_file, memory_cap = memory_cap, hard_mode = args.hard))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+import os
+import json
+import threading
+from time import perf_counter
+from functools import wraps
+from collections import deque
+from contextlib import contextmanager, nullcontext
+
+TRACE_EVENTS = 200000
+TRACE_STEPS = 12
+NULL_SPAN = nullcontext()
+
+
+class Tracer:
+    # Timing spans for the game loop. Disabled, span() hands back one shared null context
+    # and step() wrappers only test a flag, so the hooks can stay in the hot path.
+    # Spans are kept as Chrome trace 'complete' events (Perfetto and chrome://tracing load them).
+    def __init__(self, enabled = False, steps = TRACE_STEPS):
+        self.enabled = enabled
+        self.origin = perf_counter()
+        self.events = deque(maxlen = TRACE_EVENTS)
+        self.steps = deque(maxlen = steps)
+        self.step_count = 0
+        self.thread_names = {}
+
+    def add(self, name, start, end, args = None):
+        thread = threading.current_thread()
+        self.thread_names[thread.ident] = thread.name
+        event = {'name': name, 'ph': 'X', 'ts': (start - self.origin) * 1e6, 'dur': (end - start) * 1e6, 'pid': os.getpid(), 'tid': thread.ident}
+        if args:
+            event['args'] = args
+        self.events.append(event)
+
+    def span(self, name, **args):
+        if not self.enabled:
+            return NULL_SPAN
+        return self.record(name, args)
+
+    @contextmanager
+    def record(self, name, args):
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, start, perf_counter(), args)
+
+    def step(self, name):
+        # decorator for one user-visible step (a guess, a restart...); its latency also
+        # goes to `steps`, which the overlay shows
+        def decorate(function):
+            @wraps(function)
+            def traced(*args, **kwargs):
+                if not self.enabled:
+                    return function(*args, **kwargs)
+                start = perf_counter()
+                try:
+                    return function(*args, **kwargs)
+                finally:
+                    end = perf_counter()
+                    self.add(name, start, end)
+                    self.steps.append((name, (end - start) * 1000))
+                    self.step_count += 1
+
+            return traced
+
+        return decorate
+
+    def summary(self):
+        # total and mean milliseconds per span name, slowest first
+        totals = {}
+        for event in list(self.events):
+            count, total = totals.get(event['name'], (0, 0))
+            totals[event['name']] = (count + 1, total + event['dur'] / 1000)
+
+        return sorted(((name, count, total, total / count) for name, (count, total) in totals.items()), key = lambda row: row[2], reverse = True)
+
+    def export(self, path):
+        metadata = [{'name': 'thread_name', 'ph': 'M', 'pid': os.getpid(), 'tid': ident, 'args': {'name': name}} for ident, name in self.thread_names.items()]
+        temp_path = f'{path}.{os.getpid()}.tmp'
+        with open(temp_path, 'w') as fp:
+            json.dump({'traceEvents': metadata + list(self.events), 'displayTimeUnit': 'ms'}, fp)
+        os.replace(temp_path, path)
+
+        return path
+
+
+# one tracer per process; the app switches it on with --trace or Alt+T
+tracer = Tracer()
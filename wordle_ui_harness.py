@@ -0,0 +1,217 @@
+import os
+import gc
+import sys
+import time
+import random
+import argparse
+import resource
+import tempfile
+import subprocess
+import numpy as np
+import customtkinter as ctk
+from wordle_solver import Wordle_Solver
+from wordle_app import Wordle
+
+DISPLAY = ':99'
+SCREEN = '1280x800x24'
+GAMES = 1000
+WARMUP_GAMES = 20
+SAMPLE_EVERY = 50
+MEMORY_GROWTH_MB = 32
+OBJECT_GROWTH = 0.10
+STEP_TIMEOUT = 30
+PERCENTILES = (50, 90, 99)
+
+
+def start_display(display = DISPLAY, screen = SCREEN):
+    # a virtual X server for the window, unless a display is already there
+    if os.environ.get('DISPLAY'):
+        return None
+    try:
+        process = subprocess.Popen(['Xvfb', display, '-screen', '0', screen, '-nolisten', 'tcp'], stdout = subprocess.DEVNULL, stderr = subprocess.DEVNULL)
+    except FileNotFoundError:
+        sys.exit('Xvfb not found: install it (e.g. the xvfb package) or run with DISPLAY set')
+    socket = f'/tmp/.X11-unix/X{display.lstrip(":")}'
+    deadline = time.perf_counter() + 10
+    while not os.path.exists(socket):
+        if process.poll() is not None or time.perf_counter() > deadline:
+            process.kill()
+            sys.exit(f'Xvfb did not start on {display}')
+        time.sleep(0.05)
+    os.environ['DISPLAY'] = display
+
+    return process
+
+
+def resident_mb():
+    # current resident set size; the peak where /proc is missing
+    try:
+        with open('/proc/self/statm') as fp:
+            return int(fp.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2**20
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 2**10
+
+
+def count_widgets(widget):
+    return 1 + sum(count_widgets(child) for child in widget.winfo_children())
+
+
+class UI_Harness:
+    # Plays the real window the way a user would: each guess is typed into the entry one
+    # letter at a time and sent with the Apply button. A step's 'input' latency runs from
+    # the first letter until the event queue is idle again, its 'hints' latency until the
+    # hint panel has the new ranking. Guesses come from the bot, on a solver of its own.
+    def __init__(self, app, timeout = STEP_TIMEOUT):
+        self.app = app
+        self.timeout = timeout
+        # the engine loads in the background; play starts once the first hints are shown
+        self.pump(lambda: hasattr(app, 'solver') and not app.hint_frame.busy)
+        self.solver = Wordle_Solver(app.engine, metric = app.metric, hard_mode = app.hard_mode)
+        self.latencies = {}
+        self.samples = []
+        self.games = 0
+        self.won = 0
+        self.guesses = 0
+
+    def pump(self, done):
+        start_time = time.perf_counter()
+        while not done():
+            self.app.update()
+            if time.perf_counter() - start_time > self.timeout:
+                raise TimeoutError(f'the window did not settle within {self.timeout}s')
+            # lets the hint worker thread run between event batches
+            time.sleep(0.0005)
+
+    def record(self, kind, input_seconds, hint_seconds):
+        self.latencies.setdefault(kind, ([], []))
+        self.latencies[kind][0].append(input_seconds * 1000)
+        self.latencies[kind][1].append(hint_seconds * 1000)
+
+    def step(self, action):
+        # the action, then idle once for 'input', then wait for the hints for 'hints'
+        start_time = time.perf_counter()
+        action()
+        self.app.update()
+        input_seconds = time.perf_counter() - start_time
+        self.pump(lambda: not self.app.hint_frame.busy)
+
+        return input_seconds, time.perf_counter() - start_time
+
+    def type_and_apply(self, guess):
+        for length in range(1, len(guess) + 1):
+            self.app.word_var.set(guess[:length].upper())
+            self.app.update_idletasks()
+        self.app.button.invoke()
+
+    def play_game(self):
+        while self.app.word_entry.cget('state') != 'disabled':
+            self.solver.set_position(self.app.solver.candidates, self.app.solver.history, self.app.solver.legal)
+            guess = self.solver.best_guess()
+            turn = len(self.app.solver.history)
+            latency = self.step(lambda: self.type_and_apply(guess))
+            if len(self.app.solver.history) == turn:
+                raise RuntimeError(f'the window rejected the guess {guess!r}')
+            self.guesses += 1
+            # the last guess of a game also writes it to the stats
+            self.record('game over' if self.app.word_entry.cget('state') == 'disabled' else 'guess', *latency)
+        self.games += 1
+        self.won += self.app.solver.history[-1][1] == self.app.engine.win_hint
+
+    def sample(self):
+        gc.collect()
+        self.samples.append({
+            'games': self.games,
+            'widgets': count_widgets(self.app),
+            'after_jobs': len(self.app.tk.splitlist(self.app.tk.call('after', 'info'))),
+            'objects': len(gc.get_objects()),
+            'rss_mb': resident_mb(),
+        })
+
+    def run(self, games, warmup = WARMUP_GAMES, sample_every = SAMPLE_EVERY):
+        for game in range(games):
+            if game:
+                self.record('restart', *self.step(self.app.restart.invoke))
+            self.play_game()
+            if self.games == min(warmup, games) or (self.games > warmup and self.games % sample_every == 0) or self.games == games:
+                self.sample()
+
+
+def growth_warnings(samples, memory_growth = MEMORY_GROWTH_MB, object_growth = OBJECT_GROWTH):
+    # the first sample is taken after the warm-up games, once caches and lazy widgets exist
+    if len(samples) < 2:
+        return []
+    first, last = samples[0], samples[-1]
+    warnings = []
+    if last['widgets'] > first['widgets']:
+        warnings.append(f"widgets grew from {first['widgets']} to {last['widgets']}")
+    if last['after_jobs'] > first['after_jobs'] + 2:
+        warnings.append(f"pending after() jobs grew from {first['after_jobs']} to {last['after_jobs']}")
+    if last['objects'] > first['objects'] * (1 + object_growth):
+        warnings.append(f"Python objects grew from {first['objects']} to {last['objects']} (limit {object_growth:.0%})")
+    if last['rss_mb'] - first['rss_mb'] > memory_growth:
+        warnings.append(f"resident memory grew from {first['rss_mb']:.1f} MB to {last['rss_mb']:.1f} MB (limit +{memory_growth} MB)")
+
+    return warnings
+
+
+def print_report(harness, elapsed, settings):
+    # settings first, so a pasted report says which run it was
+    print(' '.join(f'{name}={value}' for name, value in settings.items()))
+    print(f'{harness.games} games, {harness.guesses} guesses in {elapsed:.1f}s: won {harness.won}, mean {harness.guesses / max(1, harness.games):.3f} guesses')
+    print(f"{'step':<10}{'count':>7}" + ''.join(f'{f"input p{p}":>11}' for p in PERCENTILES) + f"{'max':>9}" + ''.join(f'{f"hints p{p}":>11}' for p in PERCENTILES) + f"{'max':>9}")
+    for kind, (input_ms, hint_ms) in harness.latencies.items():
+        if not input_ms:
+            continue
+        columns = []
+        for values in (np.array(input_ms), np.array(hint_ms)):
+            columns += [f'{np.percentile(values, p):11.1f}' for p in PERCENTILES] + [f'{values.max():9.1f}']
+        print(f'{kind:<10}{len(input_ms):>7}' + ''.join(columns))
+    print(f"{'games':>7}{'widgets':>9}{'after':>7}{'objects':>10}{'rss MB':>9}")
+    for sample in harness.samples:
+        print(f"{sample['games']:>7}{sample['widgets']:>9}{sample['after_jobs']:>7}{sample['objects']:>10}{sample['rss_mb']:9.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description = 'Play the Wordle window with the bot under a virtual display and report end-to-end UI latency.')
+    parser.add_argument('--games', type = int, default = GAMES)
+    parser.add_argument('--warmup', type = int, default = WARMUP_GAMES, help = 'games before the first growth sample')
+    parser.add_argument('--sample-every', type = int, default = SAMPLE_EVERY, help = 'games between growth samples')
+    parser.add_argument('--memory-growth', type = float, default = MEMORY_GROWTH_MB, help = 'resident memory growth (MB) that counts as a leak')
+    parser.add_argument('--panel', choices = ('hint', 'stats', 'blank'), default = 'hint', help = 'side panel kept open while playing (stats redraws the chart after every game)')
+    parser.add_argument('--hard', action = 'store_true', help = 'play in hard mode')
+    parser.add_argument('--seed', type = int, default = 0, help = 'seed for the targets the window picks')
+    parser.add_argument('--display', default = DISPLAY, help = 'display for Xvfb when DISPLAY is not set')
+    args = parser.parse_args()
+
+    display = start_display(args.display)
+    history_dir = tempfile.mkdtemp(prefix = 'wordle_ui_')
+    random.seed(args.seed)
+    try:
+        # the session's games go to a throwaway history, not the player's
+        ctk.set_appearance_mode('light')
+        app = Wordle(hard_mode = args.hard, history_file = os.path.join(history_dir, 'game_history.db'), run = False)
+        harness = UI_Harness(app)
+        while app.selected_widget != args.panel:
+            app.switch_widgets()
+            app.update()
+
+        start_time = time.perf_counter()
+        harness.run(args.games, args.warmup, args.sample_every)
+        print_report(harness, time.perf_counter() - start_time, {'panel': args.panel, 'hard': args.hard, 'seed': args.seed, 'warmup': args.warmup, 'display': os.environ['DISPLAY']})
+        app.close_app()
+    finally:
+        for file_name in os.listdir(history_dir):
+            os.remove(os.path.join(history_dir, file_name))
+        os.rmdir(history_dir)
+        if display is not None:
+            display.terminate()
+
+    warnings = growth_warnings(harness.samples, args.memory_growth)
+    for warning in warnings:
+        print(f'GROWTH {warning}')
+    if warnings:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+from queue import Queue, Empty
+from threading import Thread
+from wordle_engine import CACHE_DIR, RANKING_CACHE_SIZE
+from wordle_solver import Wordle_Solver, board_key
+from wordle_trace import tracer
+
+
+class Hint_Worker(Thread):
+    # Scores positions off the Tk thread. Jobs carry a generation number; submitting a
+    # new job or calling cancel() bumps it, so stale work is skipped or its result dropped.
+    # The window drains `results` from an after() poll and never waits on this thread.
+    def __init__(self, engine, book_dir = CACHE_DIR, cache_size = RANKING_CACHE_SIZE):
+        super().__init__(daemon = True, name = 'hint worker')
+        self.solver = Wordle_Solver(engine, book_dir = book_dir, cache_size = cache_size)
+        self.jobs = Queue()
+        self.results = Queue()
+        self.generation = 0
+
+    def submit(self, candidates, history, metric, lookahead = False, legal = None, book = True):
+        # legal: the hard-mode legal guesses, None outside hard mode; book = False scores
+        # every allowed guess even where the opening book has the position
+        self.generation += 1
+        self.jobs.put((self.generation, candidates, tuple(history), metric, lookahead, legal, book))
+
+        return self.generation
+
+    def cancel(self):
+        self.generation += 1
+
+    def stop(self):
+        self.cancel()
+        self.jobs.put(None)
+
+    def is_stale(self, generation):
+        return generation != self.generation
+
+    def run(self):
+        while True:
+            job = self.jobs.get()
+
+            # only the newest queued job matters
+            try:
+                while job is not None:
+                    job = self.jobs.get_nowait()
+            except Empty:
+                pass
+            if job is None:
+                break
+
+            generation, candidates, history, metric, lookahead, legal, book = job
+            if self.is_stale(generation):
+                continue
+
+            # a list of candidate arrays is a multi-board position: scored jointly, no book or
+            # lookahead, but cached alongside the single-board positions
+            if isinstance(candidates, list):
+                with tracer.span('score boards', boards = len(candidates), metric = metric):
+                    ranking = self.solver.cache.get(board_key(metric, candidates), lambda: self.solver.engine.board_ranking(candidates, metric))
+                if not self.is_stale(generation):
+                    self.results.put((generation, 'rank', ranking, None))
+                    self.results.put((generation, 'done', None, None))
+                continue
+
+            self.solver.hard_mode = legal is not None
+            self.solver.set_position(candidates, history, legal)
+            self.solver.metric = metric
+            with tracer.span('score position', candidates = len(candidates), metric = metric):
+                ranking = self.solver.ranking(book = book)
+            if self.is_stale(generation):
+                continue
+            # a book hit only has the top few guesses; the window asks for the rest with
+            # book = False once they are scrolled to
+            partial = len(candidates) > 1 and len(ranking) < len(self.solver.engine.all_guesses if legal is None else legal)
+            self.results.put((generation, 'book' if partial else 'rank', ranking, None))
+
+            if lookahead:
+                with tracer.span('lookahead'):
+                    scores = self.solver.rank_lookahead(ranking, cancelled = lambda: self.is_stale(generation))
+                if not self.is_stale(generation):
+                    self.results.put((generation, 'lookahead', ranking, scores))
+
+            self.results.put((generation, 'done', None, None))